@@ -0,0 +1,307 @@
+# balancing.py
+# network balancing -- damper settings so every terminal gets its design flow
+# the fan delivers the design total and the air splits between parallel branches by their resistance,
+# the dampers add resistance until every branch needs the same pressure at its design flow
+#
+# each segment is treated as a quadratic resistance for the flow split:  dP = R Q²
+#   R (fixed part) = (static Pa/m x length + fittings C x Pd + exit Pd at terminals) / Q²  -- from the duct chain
+#   R (damper)     = C x Pd / Q² = C x k, k = 0.5 p / A²  -- fixed per segment
+#   branches in parallel share one pressure, so flows split as R^-1/2 of each branch's subtree
+# iteration (path based -- only the paths above changed segments are looked at again):
+#   1. bottom up: the least pressure each branch needs for its design flow, with its dampers as open as
+#      they can be -- the neediest branch at a junction sets what the junction needs
+#   2. top down: every branch is handed its junction's pressure, the first damper on the way down closes
+#      to soak up the excess (a branch without one passes the excess on to the dampers below it)
+#   3. split the fan flow down the tree from the subtree resistances -- branches without a damper
+#      anywhere below take whatever their resistance gives them, so the flows redistribute
+#   4. residual = biggest flow change since the last iteration (flow error against design is reported too)
+#   5. only segments whose flow has moved more than eval_tolerance are re-run through the duct chain
+#      (friction factor moves with Re) -- they, the dampers that moved and the paths above them are
+#      all the next iteration visits
+
+from duct_batch import air_density, dynamic_viscosity, evaluate, section  # batched duct chain
+from fittings import network_fitting_losses, table_for  # damper tables + fitting losses
+
+
+# this is our network balancing class
+class NetworkBalancer:
+    def __init__(self,
+                 network,
+                 dampers=None,  # segment ids with a balancing damper, None = every terminal
+                 fittings=None,  # fittings.Fitting list, their losses are part of each segment's resistance
+                 damper_type: str = "damper_opposed_blade",  # fittings table for C <-> blade angle
+                 tolerance: float = 1e-4,  # settled once no flow moves by more than this (relative)
+                 balance_tolerance: float = 1e-3,  # converged once every damper branch is this close to design
+                 continuity_tolerance: float = 0.005,  # allowed mismatch between a parent's flow and its children's
+                 max_iterations: int = 200,
+                 eval_tolerance: float | None = None,  # re-run the duct chain past this flow change (default tolerance)
+                 ):
+        self.network = network
+        self.dampers = network.terminals() if dampers is None else list(dampers)
+        self.fittings = fittings or []
+        self.damper_table = table_for(damper_type)
+        self.open_coefficient = self.damper_table.lookup(self.damper_table.grid[0][0])  # C fully open
+        self.tolerance = tolerance
+        self.balance_tolerance = balance_tolerance
+        self.continuity_tolerance = continuity_tolerance
+        self.max_iterations = max_iterations
+        self.eval_tolerance = tolerance if eval_tolerance is None else eval_tolerance
+
+        missing = [segment_id for segment_id in self.dampers if segment_id not in network.segments]
+        if missing:
+            raise ValueError(f"Damper segment not found: {missing[0]}!")
+
+        # design flows must add up -- every parent carries exactly what its branches take
+        # (otherwise no damper setting can give every terminal its design flow)
+        for segment_id, segment in network.segments.items():
+            branches = network.children(segment_id)
+            if not branches:
+                continue
+            downstream = sum(network.segments[b].flow_rate for b in branches)
+            if abs(segment.flow_rate - downstream) > continuity_tolerance * segment.flow_rate:
+                raise ValueError(f"{segment_id}: design flow {segment.flow_rate} L/s doesn't match its "
+                                 f"branches ({downstream} L/s)!")
+
+    # balance the network -> damper settings, flows and diagnostics
+    def solve(self):
+        network = self.network
+        segments = list(network.segments.values())
+        count = len(segments)
+        parents = network.parent_indices()
+        positions = network.index()
+        children = [[positions[c] for c in network.children(s.segment_id)] for s in segments]
+        roots = [i for i in range(count) if parents[i] < 0]
+        terminal = [not c for c in children]
+
+        # design flows and the fixed per segment values
+        design = [s.flow_rate for s in segments]
+        density = air_density(network.temperature, network.relative_humidity, network.elevation)
+        viscosity = dynamic_viscosity(network.temperature)
+        sections = [section(s.duct_type, s.width, s.height, s.diameter) for s in segments]
+        k = [0.5 * density * 1e-6 / a**2 for a, _ in sections]  # Pd / Q² (Q in L/s)
+
+        # fitting losses scale with Pd, so keep them as a summed C on each segment's own Pd (at design flow --
+        # inlet referenced fittings like expansions are on the parent's Pd, converted here the same way)
+        fitting_c = [0.0] * count
+        if self.fittings:
+            losses = network_fitting_losses(network, self.fittings)
+            fitting_c = [losses[s.segment_id] / (k[i] * design[i]**2) for i, s in enumerate(segments)]
+
+        damped = [positions[segment_id] for segment_id in self.dampers]
+        C = [0.0] * count
+        for i in damped:
+            C[i] = self.open_coefficient  # start with every damper fully open
+
+        # fixed resistances at the design flows to begin with
+        flows = list(design)
+        evaluated_at = list(design)  # flow each segment's fixed resistance was worked out at
+        R_fixed = [0.0] * count
+
+        def update_fixed(indices):
+            if not indices:
+                return
+            results = evaluate([sections[i][0] for i in indices], [sections[i][1] for i in indices],
+                               [flows[i] for i in indices], [segments[i].roughness for i in indices],
+                               density, viscosity)
+            for n, i in enumerate(indices):
+                loss = (results["static_pressure_drop"][n] * segments[i].length
+                        + (fitting_c[i] + terminal[i]) * results["dynamic_pressure_drop"][n])
+                R_fixed[i] = loss / flows[i]**2
+                evaluated_at[i] = flows[i]
+
+        update_fixed(list(range(count)))
+
+        is_damped = [False] * count
+        for i in damped:
+            is_damped[i] = True
+
+        # adjustable = a damper on every path down to the terminals, so its design flow can be forced
+        # reachable = at least one damper below, so it's worth handing a pressure down to it
+        adjustable = [False] * count
+        reachable = [False] * count
+        for i in reversed(range(count)):
+            adjustable[i] = is_damped[i] or (bool(children[i]) and all(adjustable[c] for c in children[i]))
+            reachable[i] = is_damped[i] or any(reachable[c] for c in children[i])
+        balanced_below = [bool(c) and all(adjustable[n] for n in c) for c in children]
+
+        # subtree resistance (segment + everything downstream)
+        R_sub = [0.0] * count
+
+        def parallel(branches):
+            return sum(R_sub[c]**-0.5 for c in branches)**-2
+
+        # own pressure drop at design flow with the damper fully open
+        def own_open(i):
+            return (R_fixed[i] + (self.open_coefficient * k[i] if is_damped[i] else 0.0)) * design[i]**2
+
+        # least pressure a branch needs for its design flow
+        need = [0.0] * count
+
+        def update(i):
+            R = R_fixed[i] + C[i] * k[i]
+            down = 0.0
+            if children[i]:
+                R += parallel(children[i])
+                if balanced_below[i]:
+                    down = max(need[c] for c in children[i])  # the neediest branch sets it
+                else:
+                    down = parallel(children[i]) * design[i]**2  # unbalanced below, flows fall as they split
+            R_sub[i] = R
+            need[i] = own_open(i) + down
+
+        for i in reversed(range(count)):
+            update(i)
+
+        # everything above a set of segments, deepest first
+        def paths_above(indices):
+            found = set()
+            for i in indices:
+                while i >= 0 and i not in found:
+                    found.add(i)
+                    i = parents[i]
+            return sorted(found, reverse=True)
+
+        target = [None] * count  # inlet pressure handed down to each branch with a damper below it
+        stale = set(range(count))  # segments the next top down pass has to visit
+        fan_flow = network.fan_flow()
+        residuals = []
+        flow_errors = []
+        damper_error = 0.0
+        evaluations = [count]  # segments run through the duct chain, per iteration
+        converged = False
+        iteration = 0
+
+        def split_flows():
+            self._split(fan_flow, roots, flows, R_sub)
+            for i in range(count):
+                if children[i]:
+                    self._split(flows[i], children[i], flows, R_sub)
+
+        # starting point: dampers open, flows as they'd split unbalanced
+        split_flows()
+        flow_errors.append(max(abs(flows[i] / design[i] - 1) for i in range(count) if terminal[i]))
+
+        while iteration < self.max_iterations:
+            iteration += 1
+
+            # 2. top down pressure targets -- only into branches whose target changed or that are stale
+            if all(adjustable[r] for r in roots):
+                fan_pressure = max(need[r] for r in roots)
+            else:
+                fan_pressure = parallel(roots) * fan_flow**2
+            stack = [(r, fan_pressure) for r in roots]
+            moved_dampers = []
+            while stack:
+                i, pressure = stack.pop()
+                if not reachable[i] or (pressure == target[i] and i not in stale):
+                    continue
+                target[i] = pressure
+                if is_damped[i]:
+                    # this damper soaks up everything above what the branch needs
+                    new_c = max(self.open_coefficient,
+                                self.open_coefficient + (pressure - need[i]) / (k[i] * design[i]**2))
+                    if new_c != C[i]:
+                        C[i] = new_c
+                        moved_dampers.append(i)
+                    outlet = need[i] - own_open(i)
+                else:
+                    outlet = pressure - R_fixed[i] * design[i]**2  # the excess carries on down
+                stack.extend((c, outlet) for c in children[i])
+
+            # resistances + needs on the paths above the dampers that moved
+            for i in paths_above(moved_dampers):
+                update(i)
+
+            # 3. split the fan flow down the tree (upstream first, so a parent's flow is always known)
+            previous = list(flows)
+            split_flows()
+
+            # 4. residuals
+            residual = max(abs(flows[i] / previous[i] - 1) for i in range(count))
+            residuals.append(residual)
+            flow_errors.append(max(abs(flows[i] / design[i] - 1) for i in range(count) if terminal[i]))
+
+            # 5. sparse duct chain re-run where the flow has really moved
+            moved = [i for i in range(count) if abs(flows[i] / evaluated_at[i] - 1) > self.eval_tolerance]
+            update_fixed(moved)
+            evaluations.append(len(moved))
+            if residual < self.tolerance and not moved and not moved_dampers:
+                # settled -- only converged if the dampers actually got their branches to design
+                damper_error = max((abs(flows[i] / design[i] - 1) for i in damped), default=0.0)
+                converged = damper_error < self.balance_tolerance
+                break
+
+            # 1. bottom up needs on the changed paths, and they're what the next top down pass visits
+            stale = paths_above(moved + moved_dampers)
+            for i in stale:
+                update(i)
+            stale = set(stale)
+
+        # fan pressure = parallel combination of the root subtrees at the fan flow
+        R_fan = sum(R_sub[i]**-0.5 for i in roots)**-2
+        dampers = {}
+        for i in damped:
+            dampers[segments[i].segment_id] = {
+                "coefficient": C[i],  # N/A
+                "pressure_drop": C[i] * k[i] * flows[i]**2,  # Pa across the damper
+                "blade_angle": self.damper_table.setting_for(C[i]) if len(self.damper_table.axes) == 1 else None,
+            }
+        return {
+            "dampers": dampers,
+            "flows": {s.segment_id: flows[i] for i, s in enumerate(segments)},  # L/s
+            "fan_pressure": R_fan * fan_flow**2,  # Pa
+            "converged": converged,  # settled with every damper branch at its design flow
+            "damper_error": damper_error,  # worst damper branch flow error when it settled
+            "iterations": iteration,
+            "residuals": residuals,  # biggest relative flow change per iteration
+            "flow_errors": flow_errors,  # worst terminal flow error against design (dampers open first)
+            "evaluations": evaluations,  # segments re-run through the duct chain per iteration
+        }
+
+    # share a flow between parallel branches as R^-1/2 (equal pressure across them)
+    @staticmethod
+    def _split(flow, branches, flows, R_sub):
+        if len(branches) == 1:
+            flows[branches[0]] = flow
+            return
+        weights = [R_sub[b]**-0.5 for b in branches]
+        total = sum(weights)
+        for b, w in zip(branches, weights):
+            flows[b] = flow * w / total
+
+
+# Main guard
+# This runs only when balancing.py is executed directly
+if __name__ == "__main__":
+    import random  # varied branch lengths
+    import time  # timing
+    from network import DuctNetwork, DuctSegment  # demo network
+
+    # fan -> riser -> 20 floor mains -> 100 terminal branches each (2000 terminals)
+    rng = random.Random(1)
+    network = DuctNetwork()
+    network.add(DuctSegment("RISER", "Rectangular", 20 * 100 * 25, width=1600, height=1000, length=60))
+    for floor in range(20):
+        network.add(DuctSegment(f"F{floor}", "Rectangular", 100 * 25, width=800, height=400,
+                                length=10 + 2 * floor, parent="RISER"))
+        for branch in range(100):
+            network.add(DuctSegment(f"F{floor}-B{branch}", "Round", 25, diameter=rng.choice([125, 160]),
+                                    length=rng.uniform(2, 30), parent=f"F{floor}"))
+
+    # dampers on every terminal, then only on the floor takeoffs (terminals split as they fall)
+    for label, dampers in (("terminal dampers", None), ("floor takeoff dampers only", [f"F{n}" for n in range(20)])):
+        start = time.perf_counter()
+        result = NetworkBalancer(network, dampers=dampers).solve()
+        elapsed = time.perf_counter() - start
+        print(f"{label}: {len(network)} segments, {len(network.terminals())} terminals -> "
+              f"converged={result['converged']} in {result['iterations']} iterations, {elapsed:.2f} s, "
+              f"fan {result['fan_pressure']:.0f} Pa")
+        print(f"  residuals {' '.join(f'{r:.1e}' for r in result['residuals'])}")
+        print(f"  duct chain re-runs per iteration {result['evaluations']}")
+        print(f"  worst damper branch flow error {100 * result['damper_error']:.3f}%")
+        print(f"  worst terminal flow error {100 * result['flow_errors'][0]:.1f}% unbalanced -> "
+              f"{100 * result['flow_errors'][-1]:.2f}% balanced")
+        index = [sid for sid, d in result["dampers"].items() if d["blade_angle"] < 0.01]
+        worst = max(result["dampers"].items(), key=lambda item: item[1]["coefficient"])
+        print(f"  fully open (index) dampers {index}, most closed {worst[0]} C={worst[1]['coefficient']:.2f} "
+              f"({worst[1]['blade_angle']:.1f}°, {worst[1]['pressure_drop']:.1f} Pa)")
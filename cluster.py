@@ -0,0 +1,392 @@
+# cluster.py
+# multi-node batch sizing -- a coordinator shards schedules into work units and hands them
+# to worker processes (on this or other machines) over a plain TCP socket
+#
+# protocol = one JSON object per line, worker speaks first:
+#   worker -> {"type": "hello", "worker": name}
+#   worker -> {"type": "request"}
+#   coord  -> {"type": "unit", "unit": n, "rows": [...]} | {"type": "wait", "seconds": s} | {"type": "done"}
+#   worker -> {"type": "result", "unit": n, "rows": [...]}
+# a unit handed to a worker that disconnects (or sits on it past its lease) goes back in the queue
+# schedules are read as workers ask for units, and results are written in schedule order however the
+# units come back -- each unit's rows are dropped once written, so the coordinator's memory stays flat
+#
+# usage:
+#   python3 cluster.py coordinator schedule.csv [more.csv ...] [--port 5050] [--local-workers 4]
+#   python3 cluster.py worker --host coordinator-host --port 5050
+
+import json  # message encoding
+import socket  # plain TCP
+import socketserver  # threaded coordinator server
+import threading  # coordinator state lock + server thread
+import time  # leases + back off
+from collections import deque  # pending unit queue
+
+from controller import DuctController  # our duct controller
+from schedule import RESULT_COLUMNS, normalise_row, read_schedule, solve_inputs, write_schedule
+
+
+# send one message as a JSON line
+def send_message(stream, message: dict):
+    stream.write(json.dumps(message, separators=(",", ":")).encode("utf-8") + b"\n")
+    stream.flush()
+
+
+# read one JSON line, None when the other side has gone
+def receive_message(stream):
+    line = stream.readline()
+    if not line:
+        return None
+    return json.loads(line)
+
+
+# WORKER
+# solve one unit of raw schedule rows -> rows with the result columns appended
+def solve_unit(controller: DuctController, rows: list, first_row_number: int):
+    solved = []
+    for number, row in enumerate(rows, start=first_row_number):
+        try:
+            _, inputs = normalise_row(row, number)
+            results = solve_inputs(controller, inputs)
+        except ValueError as e:
+            results = {"Error": str(e)}
+        solved.append(row | results)
+    return solved
+
+
+# connect to a coordinator and work until it says we're done
+# returns the number of units this worker solved
+def run_worker(host: str, port: int, name: str | None = None, retry_seconds: float = 10.0):
+    name = name or f"{socket.gethostname()}:{threading.get_native_id()}"
+    controller = DuctController()
+    solved = 0
+
+    # the coordinator may still be starting up -- keep trying for a little while
+    deadline = time.monotonic() + retry_seconds
+    while True:
+        try:
+            connection = socket.create_connection((host, port))
+            break
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.2)
+
+    with connection, connection.makefile("rwb") as stream:
+        send_message(stream, {"type": "hello", "worker": name})
+        while True:
+            send_message(stream, {"type": "request"})
+            message = receive_message(stream)
+            if message is None:
+                break  # coordinator went away
+            match (message["type"]):
+                case "unit":
+                    rows = solve_unit(controller, message["rows"], message["first_row"])
+                    send_message(stream, {"type": "result", "unit": message["unit"], "rows": rows})
+                    solved += 1
+                case "wait":  # everything is handed out, but some may come back for a retry
+                    time.sleep(message["seconds"])
+                case "done":
+                    break
+    return solved
+
+
+# COORDINATOR
+# one schedule being processed -- its units, and where its results go
+class BatchJob:
+    def __init__(self, schedule_path: str, results_path: str):
+        self.schedule_path = schedule_path  # input schedule
+        self.results_path = results_path  # solved schedule
+        self.columns = None  # input columns from the header + result columns, known once reading starts
+        self.units = []  # global unit numbers for this job, in schedule order (grows as it's read)
+        self.read = False  # every row has been read into a unit
+
+
+# this is our coordinator class
+# schedules are read a unit at a time as workers ask for work, and each unit is written out (and dropped)
+# as soon as the units before it are in -- so at most `window` units of rows are held whatever the schedule size
+class Coordinator:
+    def __init__(self,
+                 jobs: list,  # [(schedule path, results path), ...]
+                 host: str = "127.0.0.1",
+                 port: int = 0,  # 0 = any free port
+                 unit_size: int = 500,  # rows per work unit
+                 lease_seconds: float = 120.0,  # a unit not returned in this time is handed out again
+                 max_attempts: int = 3,  # give up on a unit after this many lost workers
+                 window: int = 64,  # most units held at once (out with workers or solved waiting to be written)
+                 ):
+        self.unit_size = unit_size
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.window = window
+
+        self._lock = threading.Lock()  # guards everything below (one handler thread per worker)
+        self._ready = threading.Condition(self._lock)  # wakes the writer when results or columns come in
+        self._finished = threading.Event()  # set once every unit has a result
+        self._units = {}  # unit -> (first row number, raw rows), dropped once written
+        self._pending = deque()  # units handed back, waiting for another worker
+        self._leases = {}  # unit -> (connection, lease expiry)
+        self._attempts = {}  # unit -> times handed out
+        self._results = {}  # unit -> solved rows waiting for the units before them
+        self._unsolved = 0  # units read that don't have results yet
+        self._count = 0  # units read so far
+        self._failure = None  # error reading a schedule -- raised from run()
+        self.retries = 0  # units handed out again after a lost worker
+        self.workers = set()  # workers seen
+
+        self.jobs = [BatchJob(schedule, results) for schedule, results in jobs]
+        self._to_read = iter(self.jobs)  # schedules not opened yet
+        self._reading = None  # (job, row iterator, next row number) being split into units
+        self._all_read = not self.jobs
+        if self._all_read:
+            self._finished.set()
+
+        # threaded TCP server -- one handler thread per connected worker
+        coordinator = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                coordinator._handle(self.rfile, self.wfile)
+
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        self._server = socketserver.ThreadingTCPServer((host, port), Handler)
+        self._server.daemon_threads = True
+
+    # host, port we're listening on (port is filled in when 0 was asked for)
+    @property
+    def address(self):
+        return self._server.server_address
+
+    # READING (caller holds the lock)
+    # read the next unit_size rows into a new unit, moving on to the next schedule when one runs out
+    # returns the unit, or None once every schedule has been read
+    def _read_unit(self):
+        while True:
+            if self._reading is None:
+                job = next(self._to_read, None)
+                if job is None:
+                    self._all_read = True
+                    return None
+                self._reading = (job, read_schedule(job.schedule_path), 2)  # row 1 = header
+            job, reader, first_row = self._reading
+
+            rows = []
+            for row in reader:
+                row = {str(k): v for k, v in row.items() if k is not None}  # JSON safe, drop CSV overflow
+                if job.columns is None:
+                    job.columns = list(row) + RESULT_COLUMNS
+                    self._ready.notify_all()
+                rows.append(row)
+                if len(rows) == self.unit_size:
+                    break
+            self._reading = (job, reader, first_row + len(rows))
+
+            if len(rows) < self.unit_size:  # schedule finished
+                job.columns = job.columns or RESULT_COLUMNS
+                job.read = True
+                self._reading = None
+                self._ready.notify_all()
+            if rows:
+                return self._add_unit(job, first_row, rows)
+
+    def _add_unit(self, job, first_row, rows):
+        unit = self._count
+        self._count += 1
+        self._units[unit] = (first_row, rows)
+        self._attempts[unit] = 0
+        self._unsolved += 1
+        job.units.append(unit)
+        return unit
+
+    # done once everything has been read and every unit has a result
+    def _check_finished(self):
+        if self._all_read and not self._unsolved:
+            self._finished.set()
+
+    # SERVER SIDE OF THE PROTOCOL
+    # runs on a handler thread, one per connected worker
+    def _handle(self, rfile, wfile):
+        connection = object()  # identifies this connection's leases (worker names can repeat)
+        try:
+            while True:
+                message = receive_message(rfile)
+                if message is None:
+                    break  # worker disconnected
+                match (message["type"]):
+                    case "hello":
+                        with self._lock:
+                            self.workers.add(message["worker"])
+                    case "request":
+                        send_message(wfile, self._assign(connection))
+                    case "result":
+                        self._complete(message["unit"], message["rows"])
+        except (OSError, ValueError):
+            pass  # broken connection or garbage -- treated the same as a disconnect
+        finally:
+            self._release(connection)
+
+    # next message for a worker asking for work
+    # units handed back go out first, then new ones are read while the window has room
+    def _assign(self, connection):
+        with self._lock:
+            self._expire_leases()
+            while self._pending:
+                unit = self._pending.popleft()
+                if unit not in self._units or unit in self._results:
+                    continue  # a late worker finished it after it was requeued
+                return self._lease(unit, connection)
+
+            if not self._finished.is_set() and len(self._units) < self.window:
+                try:
+                    unit = self._read_unit()
+                except Exception as e:  # unreadable schedule -- stop the batch, run() raises it
+                    self._failure = e
+                    self._finished.set()
+                    self._ready.notify_all()
+                    return {"type": "done"}
+                if unit is not None:
+                    return self._lease(unit, connection)
+                self._check_finished()
+
+            if self._finished.is_set():
+                return {"type": "done"}
+            return {"type": "wait", "seconds": 0.5}  # units are out (or the window is full), one might come back
+
+    def _lease(self, unit, connection):
+        self._attempts[unit] += 1
+        self._leases[unit] = (connection, time.monotonic() + self.lease_seconds)
+        first_row, rows = self._units[unit]
+        return {"type": "unit", "unit": unit, "first_row": first_row, "rows": rows}
+
+    # store a unit's results (first result wins, duplicates from retried units are ignored)
+    def _complete(self, unit, rows):
+        with self._lock:
+            self._leases.pop(unit, None)
+            if unit not in self._units or unit in self._results:
+                return
+            self._results[unit] = rows
+            self._unsolved -= 1
+            self._ready.notify_all()
+            self._check_finished()
+
+    # worker gone -- everything it was holding goes back to the front of the queue
+    def _release(self, connection):
+        with self._lock:
+            for unit, (holder, _) in list(self._leases.items()):
+                if holder is connection:
+                    self._requeue(unit)
+
+    # leases that have run out are treated as lost workers
+    def _expire_leases(self):
+        now = time.monotonic()
+        for unit, (_, expiry) in list(self._leases.items()):
+            if expiry < now:
+                self._requeue(unit)
+
+    # put a unit back for another worker, or fail it once it's used up its attempts
+    def _requeue(self, unit):
+        self._leases.pop(unit, None)
+        if unit not in self._units or unit in self._results:
+            return
+        if self._attempts[unit] >= self.max_attempts:
+            # every attempt lost a worker -- report the rows as errors rather than hang forever
+            first_row, rows = self._units[unit]
+            error = f"Lost {self._attempts[unit]} workers solving rows {first_row}-{first_row + len(rows) - 1}"
+            self._results[unit] = [row | {"Error": error} for row in rows]
+            self._unsolved -= 1
+            self._ready.notify_all()
+            self._check_finished()
+            return
+        self.retries += 1
+        self._pending.appendleft(unit)
+
+    # WRITING (main thread)
+    # block until ready() is true, requeueing expired leases while we wait (caller holds the lock)
+    def _wait(self, ready, deadline: float | None):
+        while True:
+            if self._failure is not None:
+                raise self._failure
+            if ready():
+                return
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError("Batch did not finish in time")
+            self._ready.wait(1.0)
+            self._expire_leases()
+
+    # a job's solved rows in schedule order -- each unit is dropped once its rows have been handed on
+    def _ordered_rows(self, job: BatchJob, deadline: float | None):
+        index = 0
+        while True:
+            with self._ready:
+                self._wait(lambda: job.read and index == len(job.units)
+                           or index < len(job.units) and job.units[index] in self._results, deadline)
+                if index == len(job.units):
+                    return  # every unit written
+                unit = job.units[index]
+                rows = self._results.pop(unit)
+                del self._units[unit]
+                del self._attempts[unit]
+            index += 1
+            yield from rows
+
+    # RUNNING
+    # serve workers until every unit is solved, writing each job's results in schedule order as they come in
+    def run(self, timeout: float | None = None):
+        server = threading.Thread(target=self._server.serve_forever, daemon=True)
+        server.start()
+        try:
+            deadline = None if timeout is None else time.monotonic() + timeout
+            for job in self.jobs:
+                with self._ready:
+                    self._wait(lambda: job.columns is not None, deadline)  # header read by the first unit
+                write_schedule(job.results_path, job.columns, self._ordered_rows(job, deadline))
+
+            with self._lock:
+                self._finished.set()  # everything written, tell workers as they ask
+            # let connected workers collect their "done" before we stop listening
+            time.sleep(0.6)
+        finally:
+            self._server.shutdown()
+            self._server.server_close()
+
+        return {"units": self._count, "retries": self.retries, "workers": len(self.workers)}
+
+
+# Main guard
+# This runs only when cluster.py is executed directly
+if __name__ == "__main__":
+    import argparse  # command line options
+    import multiprocessing  # local worker processes
+    import os  # paths
+
+    parser = argparse.ArgumentParser(description="Sharded batch duct sizing over TCP")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    coordinator_args = commands.add_parser("coordinator", help="shard schedules and hand them to workers")
+    coordinator_args.add_argument("schedules", nargs="+", help="schedule files (CSV or .xlsx)")
+    coordinator_args.add_argument("--host", default="0.0.0.0", help="address to listen on")
+    coordinator_args.add_argument("--port", type=int, default=5050)
+    coordinator_args.add_argument("--unit-size", type=int, default=500, help="rows per work unit")
+    coordinator_args.add_argument("--window", type=int, default=64, help="most units held in memory at once")
+    coordinator_args.add_argument("--local-workers", type=int, default=0, help="also start N workers here")
+
+    worker_args = commands.add_parser("worker", help="solve units for a coordinator")
+    worker_args.add_argument("--host", default="127.0.0.1", help="coordinator address")
+    worker_args.add_argument("--port", type=int, default=5050)
+
+    args = parser.parse_args()
+
+    if args.command == "worker":
+        print(f"Solved {run_worker(args.host, args.port)} units")
+    else:
+        jobs = [(path, os.path.splitext(path)[0] + "_results" + os.path.splitext(path)[1]) for path in args.schedules]
+        coordinator = Coordinator(jobs, args.host, args.port, args.unit_size, window=args.window)
+        host, port = coordinator.address
+        print(f"Coordinator on {host}:{port} with {len(coordinator.jobs)} schedules")
+
+        local = [multiprocessing.Process(target=run_worker, args=("127.0.0.1", port)) for _ in range(args.local_workers)]
+        for process in local:
+            process.start()
+        print(coordinator.run())
+        for process in local:
+            process.join()
@@ -8,6 +8,59 @@ from duct import Duct  # our duct calculations
 class DuctController:
     # CORE: no init as we're not maintaining any state -- this is purely an intermediary class between duct.py and ui.py
 
+    # build a Duct instance from the raw inputs (shared by the UI path and batch/schedule tools)
+    # raises ValueError for unsupported duct types or bad dimensions
+    def create_duct(
+        self, 
+        duct_type: str,
+        flow_rate: int,
+        roughness: float,
+        temperature: float,
+        relative_humidity: float,
+        elevation: float,
+        noise_direction_factor: int,
+        noise_distance: float,
+        width: int | None,
+        height: int | None,
+        diameter: int | None
+        ):
+
+        # match:case blocks look so much neater than ifs
+        match (duct_type):  # duct_type is our match case input
+            case "Rectangular":  # for a rect duct
+                # create a rect duct instance
+                return Duct(duct_type=duct_type,  # same as case
+                            flow_rate=int(flow_rate),  # set int... we don't work in float rates
+                            roughness=roughness,
+                            temperature=temperature,
+                            relative_humidity=relative_humidity,
+                            elevation=elevation,
+                            noise_direction_factor=noise_direction_factor,
+                            noise_distance=noise_distance,
+                            width=int(width),  # set int... we don't work in float dims
+                            height=int(height),  # set int... we don't work in float dims
+                            diameter=None  # not needed for rectangular
+                            )
+                
+            case "Round":  # for a round duct
+                # create a round duct instance
+                return Duct(duct_type=duct_type,  # same as case
+                            flow_rate=int(flow_rate),  # set int... we don't work in float rates
+                            roughness=roughness,
+                            temperature=temperature,
+                            relative_humidity=relative_humidity,
+                            elevation=elevation,
+                            noise_direction_factor=noise_direction_factor,
+                            noise_distance=noise_distance,
+                            width=None,  # not needed for round
+                            height=None,  # not needed for round
+                            diameter=int(diameter)  # set int... we don't work in float dims
+                            )
+                
+            case _:  # default case if another type is input
+                # raise error to alert user
+                raise ValueError(f"Unsupported duct type: {duct_type}")
+
     # get all the duct information from duct.py
     def duct_properties(
         self, 
@@ -28,41 +81,10 @@ class DuctController:
         # all calcs have been done, we'll just "try" to get the info and respresent it
         # so we'll use a try-except block: if it fails, we WON'T raise an error and just output error info clearly
         try:
-            # match:case blocks look so much neater than ifs
-            match (duct_type):  # duct_type is our match case input
-                case "Rectangular":  # for a rect duct
-                    # create a rect duct instance
-                    duct = Duct(duct_type=duct_type,  # same as case
-                                flow_rate=int(flow_rate),  # set int... we don't work in float rates
-                                roughness=roughness,
-                                temperature=temperature,
-                                relative_humidity=relative_humidity,
-                                elevation=elevation,
-                                noise_direction_factor=noise_direction_factor,
-                                noise_distance=noise_distance,
-                                width=int(width),  # set int... we don't work in float dims
-                                height=int(height),  # set int... we don't work in float dims
-                                diameter=None  # not needed for rectangular
-                                )
-                    
-                case "Round":  # for a round duct
-                    # create a round duct instance
-                    duct = Duct(duct_type=duct_type,  # same as case
-                                flow_rate=int(flow_rate),  # set int... we don't work in float rates
-                                roughness=roughness,
-                                temperature=temperature,
-                                relative_humidity=relative_humidity,
-                                elevation=elevation,
-                                noise_direction_factor=noise_direction_factor,
-                                noise_distance=noise_distance,
-                                width=None,  # not needed for round
-                                height=None,  # not needed for round
-                                diameter=int(diameter)  # set int... we don't work in float dims
-                                )
-                    
-                case _:  # default case if another type is input
-                    # raise error to alert user
-                    raise ValueError(f"Unsupported duct type: {duct_type}")
+            # create the duct instance for this type
+            duct = self.create_duct(duct_type, flow_rate, roughness, temperature,
+                                    relative_humidity, elevation, noise_direction_factor,
+                                    noise_distance, width, height, diameter)
             
             # Duct instances have been made!
             # Now we just call the functions from duct.py in our return outputs!
@@ -0,0 +1,143 @@
+# duct_batch.py
+# batched version of the Duct calculation chain for evaluating many ducts / conditions in one pass
+# same physics as duct.py (air density -> viscosity -> Reynold's -> Altshul-Tsal -> pressure drop)
+# but split so invariants are worked out once and reused:
+#   air properties depend only on the conditions (temp, RH, elevation)
+#   section properties depend only on the geometry (type, size)
+# pure python lists, no numpy -- the app stays dependency free
+
+import math  # for maths like pi etc
+
+
+# AIR PROPERTIES (same formulas as Duct.calculate_air_density / calculate_dynamic_viscosity)
+# air density (kg/m3) at temperature (°C), relative humidity (%) and elevation (m)
+def air_density(temperature: float, relative_humidity: float, elevation: float):
+    Rd = 287.057  # specific gas constant for dry air (J/kg.K)
+    Rv = 461.495  # specific gas constant for water vapour (J/kg.K)
+    P = 101325 * (1 - 2.25577 * (10**-5) * elevation) ** 5.25588  # air pressure at elevation (Pa)
+    P1 = 6.1078 * 10 ** (7.5 * temperature / (temperature + 237.3))  # saturated vapour pressure
+    Pv = relative_humidity * P1  # actual vapour pressure (Pa)
+    Pd = P - Pv  # dry air pressure (Pa)
+    T_K = temperature + 273.15  # air temp in kelvin (K)
+    return (Pd / (Rd * T_K)) + (Pv / (Rv * T_K))
+
+
+# dynamic viscosity (kg/m.s) at temperature (°C) using Sutherland's law
+def dynamic_viscosity(temperature: float):
+    Sutherlands_constant = 120
+    Centipoise = 0.01827
+    T_ref_R = 524.07  # reference T (°R)
+    T_amb_R = temperature * 9 / 5 + 491.67  # ambient air °C to °R conversion
+    constant_A = 0.555 * T_ref_R + Sutherlands_constant
+    constant_B = 0.555 * T_amb_R + Sutherlands_constant
+    return Centipoise * (constant_A / constant_B) * (T_amb_R / T_ref_R) ** (3 / 2) / 1000
+
+
+# air properties for a list of conditions -> (densities, viscosities)
+# any argument can be a single value, it's repeated to match the lists
+def air_properties(temperatures, relative_humidities, elevations):
+    temperatures, relative_humidities, elevations = broadcast(temperatures, relative_humidities, elevations)
+    densities = [air_density(t, rh, z) for t, rh, z in zip(temperatures, relative_humidities, elevations)]
+    viscosities = [dynamic_viscosity(t) for t in temperatures]
+    return densities, viscosities
+
+
+# SECTION PROPERTIES (same as Duct.calculate_area / calculate_hydraulic_diameter)
+# (area m², hydraulic diameter m) for one duct section
+def section(duct_type: str, width: float | None = None, height: float | None = None, diameter: float | None = None):
+    match (duct_type):
+        case "Rectangular":
+            if width is None or height is None:
+                raise ValueError("Width and height must be provided for rectangular duct!")
+            area = width * height * 1e-6  # mm² -> m²
+            perimeter = 2 * (width + height) * 1e-3  # mm -> m
+            return area, 4 * area / perimeter
+        case "Round":
+            if diameter is None:
+                raise ValueError("Diameter must be provided for round duct!")
+            return math.pi * (diameter / 2)**2 * 1e-6, diameter * 1e-3
+        case _:
+            raise ValueError("Invalid duct type!")
+
+
+# FRICTION (same branches as Duct.calculate_flow_state / calculate_altshul_tsal)
+# relative_roughness = roughness (m) / Dh (m)
+def friction_factor(reynolds: float, relative_roughness: float):
+    if reynolds >= 4000:  # turbulent
+        f_temp = 0.11 * (relative_roughness + 68 / reynolds)**0.25
+        return f_temp if f_temp >= 0.018 else f_temp * 0.85 + 0.0028
+    if reynolds >= 2000:  # transitional
+        return 0
+    return 64 / reynolds  # laminar
+
+
+# repeat single values so every argument is a list of the same length
+def broadcast(*args):
+    length = max((len(arg) for arg in args if isinstance(arg, (list, tuple))), default=1)
+    result = []
+    for arg in args:
+        if isinstance(arg, (list, tuple)):
+            if len(arg) != length:
+                raise ValueError("Batch inputs must all be the same length!")
+            result.append(arg)
+        else:
+            result.append([arg] * length)
+    return result
+
+
+# BATCH EVALUATION
+# run the full chain for a batch -- every argument is a list or a single value (broadcast)
+# areas (m²), hydraulic_diameters (m), flow_rates (L/s), roughnesses (mm),
+# densities (kg/m3), viscosities (kg/m.s)
+# returns a dict of lists matching the Duct methods
+def evaluate(areas, hydraulic_diameters, flow_rates, roughnesses, densities, viscosities):
+    areas, hydraulic_diameters, flow_rates, roughnesses, densities, viscosities = broadcast(
+        areas, hydraulic_diameters, flow_rates, roughnesses, densities, viscosities)
+
+    velocity = []
+    reynolds = []
+    friction = []
+    static = []
+    dynamic = []
+    for A, Dh, Q, r, p, u in zip(areas, hydraulic_diameters, flow_rates, roughnesses, densities, viscosities):
+        if Q <= 0:
+            raise ValueError("Invalid flow rate!")
+        V = Q * 1e-3 / A  # L/s -> m3/s, V = Q/A
+        Re = V * Dh * p / u  # Re = V.Dh / (u/p)
+        f = friction_factor(Re, r / 1000 / Dh)
+        Pd = 0.5 * p * V**2  # velocity pressure (Pa)
+
+        velocity.append(V)
+        reynolds.append(Re)
+        friction.append(f)
+        static.append(f / Dh * Pd)  # f * (1/Dh) * p * V²/2 (Pa/m)
+        dynamic.append(Pd)
+
+    return {
+        "velocity": velocity,  # m/s
+        "reynolds": reynolds,  # N/A
+        "friction_factor": friction,  # N/A
+        "static_pressure_drop": static,  # Pa/m
+        "dynamic_pressure_drop": dynamic,  # Pa
+        "total_pressure_drop": [Ps + Pd for Ps, Pd in zip(static, dynamic)],  # Pa/m
+    }
+
+
+# Main guard
+# This runs only when duct_batch.py is executed directly
+# checks the batch chain against duct.py for a spread of sizes and conditions
+if __name__ == "__main__":
+    from duct import Duct  # the reference single duct model
+
+    cases = [("Rectangular", 400, 200, None, 300, 25, 50, 100),
+             ("Round", None, None, 250, 1000, 35, 80, 1500),
+             ("Rectangular", 1200, 300, None, 50, -5, 20, 0)]
+    densities, viscosities = air_properties([c[5] for c in cases], [c[6] for c in cases], [c[7] for c in cases])
+    sections = [section(c[0], c[1], c[2], c[3]) for c in cases]
+    results = evaluate([s[0] for s in sections], [s[1] for s in sections], [c[4] for c in cases],
+                       0.09, densities, viscosities)
+
+    for i, (duct_type, W, H, D, Q, T, RH, Z) in enumerate(cases):
+        duct = Duct(duct_type, Q, 0.09, T, RH, Z, 1, 2.1, W, H, D)
+        print(f"{duct_type} {Q} L/s: batch {results['total_pressure_drop'][i]:.6f} Pa/m, "
+              f"duct.py {duct.calculate_total_pressure_drop():.6f} Pa/m")
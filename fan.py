@@ -0,0 +1,236 @@
+# fan.py
+# fan selection -- system curve from the duct network, tabulated fan curves, operating points
+#
+# system curve: the network's index run pressure evaluated across a flow range in one batch
+# fan curve: tabulated (flow, pressure, efficiency) at a rated speed, scaled with the fan laws
+#   Q2 = Q1 (N2/N1)   P2 = P1 (N2/N1)²   efficiency unchanged
+# catalogue: fans are indexed by their "system constant" range c = P/Q², so for a duty point
+# only the fans whose curves can reach it are looked at, and each one is a bisect, not a solve
+
+import bisect  # sorted table lookups
+import csv  # catalogue files
+import math  # for maths like logs etc
+
+
+# linear interpolation in a table sorted by xs (clamped to the ends)
+def interpolate(xs, ys, x):
+    i = bisect.bisect_left(xs, x)
+    if i <= 0:
+        return ys[0]
+    if i >= len(xs):
+        return ys[-1]
+    x0, x1 = xs[i - 1], xs[i]
+    return ys[i - 1] + (ys[i] - ys[i - 1]) * (x - x0) / (x1 - x0)
+
+
+# SYSTEM CURVE
+# system resistance (Pa) against total flow (L/s)
+class SystemCurve:
+    def __init__(self, flows, pressures):
+        self.flows = list(flows)  # L/s, ascending
+        self.pressures = list(pressures)  # Pa
+
+    # build from a DuctNetwork by scaling every flow together (one batched network evaluation)
+    @classmethod
+    def from_network(cls, network, low: float = 0.2, high: float = 1.6, points: int = 29):
+        scales = [low + (high - low) * i / (points - 1) for i in range(points)]
+        design = network.fan_flow()
+        return cls([design * k for k in scales], network.index_pressures(scales))
+
+    # pressure at a flow -- interpolated inside the table, P ~ Q^n extrapolated outside it
+    def pressure_at(self, flow: float):
+        flows, pressures = self.flows, self.pressures
+        if flows[0] <= flow <= flows[-1]:
+            return interpolate(flows, pressures, flow)
+        # fit the exponent from the nearest two points and carry on along P = P0 (Q/Q0)^n
+        if flow < flows[0]:
+            (q0, p0), (q1, p1) = (flows[0], pressures[0]), (flows[1], pressures[1])
+        else:
+            (q0, p0), (q1, p1) = (flows[-1], pressures[-1]), (flows[-2], pressures[-2])
+        n = math.log(p1 / p0) / math.log(q1 / q0)
+        return p0 * (flow / q0)**n if flow > 0 else 0.0
+
+
+# FAN CURVE
+# one fan's tabulated curve at its rated speed (the stable, falling part of the curve)
+class FanCurve:
+    def __init__(self, name: str, speed: float, flows, pressures, efficiencies, max_speed: float | None = None):
+        self.name = name  # catalogue name
+        self.speed = speed  # rated speed (rpm)
+        self.max_speed = max_speed or speed  # fastest it's allowed to run (rpm)
+        self.flows = list(flows)  # L/s, ascending
+        self.pressures = list(pressures)  # Pa, falling with flow
+        self.efficiencies = list(efficiencies)  # 0-1
+        if len(self.flows) < 2:
+            raise ValueError(f"{name}: fan curve needs at least two points!")
+
+        # system constants c = P/Q² at each point -- falls along the curve, so it's sorted (reversed)
+        # a system parabola P = cQ² crosses this curve where the table passes c
+        # (a shut-off point at zero flow has c = infinity -- any steeper system still crosses before it)
+        self._constants = [p / q**2 if q > 0 else math.inf for q, p in zip(self.flows, self.pressures)]
+        self.c_min = self._constants[-1]
+        self.c_max = self._constants[0]
+
+    # the same fan at another speed (fan laws)
+    def at_speed(self, speed: float):
+        ratio = speed / self.speed
+        return FanCurve(self.name, speed, [q * ratio for q in self.flows],
+                        [p * ratio**2 for p in self.pressures], self.efficiencies, self.max_speed)
+
+    def pressure_at(self, flow: float):
+        return interpolate(self.flows, self.pressures, flow)
+
+    def efficiency_at(self, flow: float):
+        return interpolate(self.flows, self.efficiencies, flow)
+
+    # where a system parabola P = cQ² crosses the curve -> (flow, pressure, efficiency) at rated speed
+    # c falls along the table, so search the reversed list
+    def on_parabola(self, c: float):
+        if not self.c_min <= c <= self.c_max:
+            return None
+        constants = self._constants[::-1]
+        i = bisect.bisect_left(constants, c)
+        j = len(constants) - 1 - i  # back to curve order, point at/just before the crossing
+        if self._constants[j] == c or j == len(self.flows) - 1:
+            k0, k1 = j, j
+        else:
+            k0, k1 = j, j + 1
+        if k0 == k1:
+            return self.flows[k0], self.pressures[k0], self.efficiencies[k0]
+        # interpolate between the two points on either side of the crossing
+        c0, c1 = self._constants[k0], self._constants[k1]
+        t = (c0 - c) / (c0 - c1) if c0 != c1 else 0.0
+        q = self.flows[k0] + t * (self.flows[k1] - self.flows[k0])
+        return q, self.pressure_at(q), self.efficiency_at(q)
+
+
+# OPERATING POINT
+# where a fan curve meets the system curve -> (flow L/s, pressure Pa, efficiency) or None
+def operating_point(fan: FanCurve, system: SystemCurve):
+    previous = None
+    for q in fan.flows:
+        gap = fan.pressure_at(q) - system.pressure_at(q)
+        if gap == 0:
+            return q, fan.pressure_at(q), fan.efficiency_at(q)
+        if previous is not None and (previous[1] > 0) != (gap > 0):
+            # sign change between the two table points -- bisect to the crossing
+            low, high = previous[0], q
+            for _ in range(60):
+                mid = (low + high) / 2
+                if (fan.pressure_at(mid) - system.pressure_at(mid) > 0) == (previous[1] > 0):
+                    low = mid
+                else:
+                    high = mid
+            q = (low + high) / 2
+            return q, fan.pressure_at(q), fan.efficiency_at(q)
+        previous = (q, gap)
+    return None  # fan can't meet this system anywhere on its curve
+
+
+# CATALOGUE
+# many fans, indexed by the system-constant range their curves cover
+class FanCatalogue:
+    def __init__(self, fans):
+        self.fans = list(fans)
+        # sorted by c_min so a duty point only scans fans that can reach it
+        self._by_c_min = sorted(self.fans, key=lambda fan: fan.c_min)
+        self._c_mins = [fan.c_min for fan in self._by_c_min]
+
+    # long format CSV: fan, speed, flow, pressure, efficiency (+ optional max_speed), one row per curve point
+    @classmethod
+    def from_csv(cls, path: str):
+        curves = {}
+        with open(path, "r", newline="", encoding="utf-8-sig") as f:
+            for row in csv.DictReader(f):
+                row = {k.strip().lower(): v for k, v in row.items() if k is not None}
+                curve = curves.setdefault(row["fan"], {"speed": float(row["speed"]),
+                                                       "max_speed": float(row.get("max_speed") or row["speed"]),
+                                                       "points": []})
+                efficiency = float(row["efficiency"])
+                curve["points"].append((float(row["flow"]), float(row["pressure"]),
+                                        efficiency / 100 if efficiency > 1 else efficiency))  # % or fraction
+        fans = []
+        for name, curve in curves.items():
+            points = sorted(curve["points"])
+            fans.append(FanCurve(name, curve["speed"], [p[0] for p in points], [p[1] for p in points],
+                                 [p[2] for p in points], curve["max_speed"]))
+        return cls(fans)
+
+    # fans that can meet a duty point (flow L/s, pressure Pa) when speed scaled, best efficiency first
+    # -> [(efficiency, speed, fan)]
+    def rank(self, flow: float, pressure: float, min_speed_ratio: float = 0.5, limit: int | None = 10):
+        c = pressure / flow**2  # the fan-law parabola through the duty point
+
+        # index: only fans whose c range can contain c (c_min <= c), then check c_max
+        candidates = self._by_c_min[:bisect.bisect_right(self._c_mins, c)]
+        ranked = []
+        for fan in candidates:
+            if c > fan.c_max:
+                continue
+            crossing = fan.on_parabola(c)
+            if crossing is None:
+                continue
+            q, _, efficiency = crossing
+            speed = fan.speed * flow / q  # speed that slides the crossing onto the duty point
+            if speed > fan.max_speed or speed < fan.speed * min_speed_ratio:
+                continue
+            ranked.append((efficiency, speed, fan))
+
+        ranked.sort(key=lambda item: -item[0])
+        return ranked if limit is None else ranked[:limit]
+
+    # rank fans for a network's design duty, then solve the true operating point of the shortlist
+    # against the real system curve (friction factor moves with flow, so it isn't exactly P = cQ²)
+    def select(self, network, limit: int = 5):
+        system = SystemCurve.from_network(network)
+        flow = network.fan_flow()
+        selections = []
+        for efficiency, speed, fan in self.rank(flow, system.pressure_at(flow), limit=limit):
+            point = operating_point(fan.at_speed(speed), system)
+            if point is not None:
+                selections.append({"fan": fan.name, "speed": speed, "flow": point[0],
+                                   "pressure": point[1], "efficiency": point[2]})
+        return selections
+
+
+# Main guard
+# This runs only when fan.py is executed directly
+if __name__ == "__main__":
+    import random  # synthetic catalogue
+    import time  # timing
+    from network import DuctNetwork, DuctSegment  # demo network
+
+    # fan -> riser -> 4 floor mains -> 10 branches each
+    network = DuctNetwork()
+    network.add(DuctSegment("RISER", "Rectangular", 4000, width=1000, height=600, length=30))
+    for floor in range(4):
+        network.add(DuctSegment(f"F{floor}", "Rectangular", 1000, width=600, height=300, length=60, parent="RISER"))
+        for branch in range(10):
+            network.add(DuctSegment(f"F{floor}-B{branch}", "Round", 100, diameter=160, length=8 + branch,
+                                    parent=f"F{floor}"))
+
+    start = time.perf_counter()
+    system = SystemCurve.from_network(network)
+    print(f"System curve ({len(system.flows)} points) in {time.perf_counter() - start:.3f} s, "
+          f"design {network.fan_flow()} L/s @ {system.pressure_at(network.fan_flow()):.0f} Pa")
+
+    # synthetic catalogue: 500 fans with parabolic pressure curves and an efficiency hump
+    rng = random.Random(1)
+    fans = []
+    for n in range(500):
+        shutoff = rng.uniform(100, 1500)  # Pa at zero flow
+        free_flow = rng.uniform(1000, 12000)  # L/s at zero pressure
+        peak = rng.uniform(0.55, 0.85)  # best efficiency
+        flows = [free_flow * i / 20 for i in range(21)]
+        pressures = [shutoff * (1 - (q / free_flow)**2) for q in flows]
+        efficiencies = [peak * (1 - ((q / free_flow) - 0.55)**2 / 0.3) for q in flows]
+        fans.append(FanCurve(f"FAN-{n:03d}", 1450, flows, pressures, [max(e, 0.05) for e in efficiencies],
+                             max_speed=1800))
+    catalogue = FanCatalogue(fans)
+
+    start = time.perf_counter()
+    selections = catalogue.select(network)
+    print(f"Ranked {len(fans)} fans in {time.perf_counter() - start:.3f} s")
+    for s in selections:
+        print(f"  {s['fan']} @ {s['speed']:.0f} rpm: {s['flow']:.0f} L/s, {s['pressure']:.0f} Pa, "
+              f"{100 * s['efficiency']:.1f}%")
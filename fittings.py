@@ -0,0 +1,359 @@
+# fittings.py
+# fitting losses -- elbows, tees, transitions and dampers
+# Duct.calculate_loss_coefficient only covers the straight run (Ps/Pd), real systems lose most of
+# their pressure in the fittings: loss (Pa) = C x Pd, with C looked up from tabulated data
+#
+# each fitting type is a table of C over one or more geometry / flow ratios (the axes)
+# lookups are clamped multilinear interpolation between the tabulated points
+# the tables are typical handbook style values -- register() a table to add or replace one
+# with data from your own source
+
+import bisect  # sorted axis lookups
+
+from duct_batch import air_density, broadcast, section  # batched duct chain
+
+# which velocity pressure a table's C is applied to -> whose Pd that is for a fitting on a network segment
+# a fitting belongs to the segment its outlet feeds, so only the inlet side (expansions) looks upstream
+REFERENCES = {
+    "fitting": "segment",  # elbows, dampers -- same section in and out
+    "branch": "segment",  # tee, branch path -- the branch segment
+    "downstream": "segment",  # tee, straight through -- the segment after the tee
+    "outlet": "segment",  # contraction -- the smaller section it feeds
+    "inlet": "parent",  # expansion -- the smaller section feeding it
+    "upstream": "parent",
+}
+
+
+# this is our coefficient table class -- C tabulated over a grid of axes
+class CoefficientTable:
+    def __init__(self, name: str, axes: list, values: list, reference: str = "fitting"):
+        self.name = name  # fitting type
+        self.axes = [axis for axis, _ in axes]  # parameter names, in lookup order
+        self.grid = [list(points) for _, points in axes]  # tabulated points along each axis (ascending)
+        self.reference = reference  # which velocity pressure C is applied to (see REFERENCES)
+        if reference not in REFERENCES:
+            raise ValueError(f"{name}: unknown velocity pressure reference {reference}!")
+
+        # flatten the nested values (first axis outermost) and keep the stride of each axis
+        flat = values
+        for _ in range(len(self.grid) - 1):
+            flat = [value for row in flat for value in row]
+        size = 1
+        for points in self.grid:
+            if len(points) < 2 or points != sorted(points):
+                raise ValueError(f"{name}: every axis needs at least two ascending points!")
+            size *= len(points)
+        if len(flat) != size:
+            raise ValueError(f"{name}: table has {len(flat)} values, axes need {size}!")
+        self.values = flat
+        self.strides = []
+        stride = 1
+        for points in reversed(self.grid):
+            self.strides.insert(0, stride)
+            stride *= len(points)
+
+    # parameters (dict) -> lookup point in axis order
+    def point(self, parameters: dict):
+        try:
+            return tuple(float(parameters[axis]) for axis in self.axes)
+        except KeyError as e:
+            raise ValueError(f"{self.name}: missing parameter {e.args[0]}!") from None
+
+    # cell + fraction along one axis (clamped to the table ends)
+    def _locate(self, axis: int, x: float):
+        points = self.grid[axis]
+        i = bisect.bisect_right(points, x) - 1
+        if i < 0:
+            return 0, 0.0
+        if i >= len(points) - 1:
+            return len(points) - 2, 1.0
+        return i, (x - points[i]) / (points[i + 1] - points[i])
+
+    # interpolated C at a point (one value per axis)
+    def lookup(self, *point):
+        if len(point) != len(self.axes):
+            raise ValueError(f"{self.name}: expected {len(self.axes)} parameters ({', '.join(self.axes)})!")
+        values = self.values
+        match (len(point)):
+            case 1:  # straight linear interpolation
+                i, t = self._locate(0, point[0])
+                return values[i] + (values[i + 1] - values[i]) * t
+            case 2:  # bilinear, unrolled (the common case)
+                i, t = self._locate(0, point[0])
+                j, u = self._locate(1, point[1])
+                k = i * self.strides[0] + j
+                row = self.strides[0]
+                low = values[k] + (values[k + 1] - values[k]) * u
+                high = values[k + row] + (values[k + row + 1] - values[k + row]) * u
+                return low + (high - low) * t
+            case _:  # general: weighted sum over the 2^n corners of the cell
+                cells = [self._locate(axis, x) for axis, x in enumerate(point)]
+                total = 0.0
+                for corner in range(1 << len(cells)):
+                    weight = 1.0
+                    k = 0
+                    for axis, (i, t) in enumerate(cells):
+                        if corner >> axis & 1:
+                            weight *= t
+                            k += (i + 1) * self.strides[axis]
+                        else:
+                            weight *= 1 - t
+                            k += i * self.strides[axis]
+                    if weight:
+                        total += weight * values[k]
+                return total
+
+    # inverse lookup for single axis tables that rise along the axis (e.g. damper C vs blade angle)
+    # -> the axis value giving C, clamped to the table
+    def setting_for(self, coefficient: float):
+        if len(self.axes) != 1:
+            raise ValueError(f"{self.name}: only single axis tables can be inverted!")
+        points, values = self.grid[0], self.values
+        i = bisect.bisect_left(values, coefficient)
+        if i <= 0:
+            return points[0]
+        if i >= len(values):
+            return points[-1]
+        return points[i - 1] + (points[i] - points[i - 1]) * (coefficient - values[i - 1]) / (values[i] - values[i - 1])
+
+
+# DATABASE
+# angle correction for elbows other than 90° (applied to the 90° values)
+ELBOW_ANGLES = [0, 30, 45, 60, 90, 180]
+ELBOW_ANGLE_FACTORS = [0.0, 0.45, 0.60, 0.78, 1.00, 1.40]
+
+FITTINGS = {}  # fitting type -> CoefficientTable
+
+
+# add (or replace) a fitting type in the database
+def register(table: CoefficientTable):
+    FITTINGS[table.name] = table
+    return table
+
+
+# look a fitting type up, with a useful error for typos
+def table_for(fitting_type: str):
+    try:
+        return FITTINGS[fitting_type]
+    except KeyError:
+        raise ValueError(f"Unknown fitting type: {fitting_type}!") from None
+
+
+# round smooth radius elbow: C vs r/D and angle (on the elbow's own Pd)
+register(CoefficientTable(
+    "elbow_round",
+    [("radius_ratio", [0.5, 0.75, 1.0, 1.5, 2.0]), ("angle", ELBOW_ANGLES)],
+    [[c90 * k for k in ELBOW_ANGLE_FACTORS] for c90 in [0.71, 0.33, 0.22, 0.15, 0.13]],
+))
+
+# rectangular smooth radius elbow (no vanes): C vs r/W, H/W and angle
+register(CoefficientTable(
+    "elbow_rectangular",
+    [("radius_ratio", [0.5, 0.75, 1.0, 1.5, 2.0]), ("aspect_ratio", [0.25, 0.5, 1.0, 2.0, 4.0]), ("angle", ELBOW_ANGLES)],
+    [[[c90 * k for k in ELBOW_ANGLE_FACTORS] for c90 in row] for row in [
+        [1.53, 1.38, 1.18, 1.06, 1.00],  # r/W = 0.5
+        [0.57, 0.52, 0.44, 0.40, 0.39],  # 0.75
+        [0.27, 0.25, 0.21, 0.19, 0.19],  # 1.0
+        [0.22, 0.20, 0.17, 0.15, 0.15],  # 1.5
+        [0.20, 0.18, 0.15, 0.14, 0.14],  # 2.0
+    ]],
+))
+
+# diverging 90° tee, branch path: C vs Qb/Qc and Ab/Ac (on the branch Pd)
+register(CoefficientTable(
+    "tee_branch",
+    [("flow_ratio", [0.1, 0.2, 0.4, 0.6, 0.8, 0.9]), ("area_ratio", [0.25, 0.5, 0.75, 1.0])],
+    [
+        [1.12, 3.30, 7.60, 13.5],  # Qb/Qc = 0.1
+        [1.03, 1.30, 2.00, 4.00],  # 0.2
+        [1.04, 1.03, 1.13, 1.50],  # 0.4
+        [1.10, 1.01, 1.04, 1.10],  # 0.6
+        [1.20, 1.02, 1.01, 1.05],  # 0.8
+        [1.25, 1.03, 1.01, 1.04],  # 0.9
+    ],
+    reference="branch",
+))
+
+# diverging tee, straight through path: C vs Vs/Vc (on the downstream Pd)
+register(CoefficientTable(
+    "tee_main",
+    [("velocity_ratio", [0.2, 0.4, 0.6, 0.8, 1.0, 1.2])],
+    [6.40, 0.90, 0.18, 0.03, 0.00, 0.01],
+    reference="downstream",
+))
+
+# contraction: C vs outlet/inlet area and included angle (on the outlet Pd)
+register(CoefficientTable(
+    "contraction",
+    [("area_ratio", [0.1, 0.25, 0.5, 0.75, 1.0]), ("angle", [10, 30, 45, 60, 90, 180])],
+    [
+        [0.05, 0.05, 0.07, 0.12, 0.24, 0.43],  # A1/A0 = 0.1
+        [0.05, 0.05, 0.06, 0.10, 0.20, 0.36],  # 0.25
+        [0.05, 0.05, 0.05, 0.08, 0.14, 0.25],  # 0.5
+        [0.03, 0.03, 0.04, 0.05, 0.08, 0.12],  # 0.75
+        [0.00, 0.00, 0.00, 0.00, 0.00, 0.00],  # 1.0
+    ],
+    reference="outlet",
+))
+
+# expansion: C vs outlet/inlet area and included angle (on the inlet Pd)
+register(CoefficientTable(
+    "expansion",
+    [("area_ratio", [1, 2, 4, 6, 10]), ("angle", [10, 20, 30, 45, 60, 90, 180])],
+    [
+        [0.00, 0.00, 0.00, 0.00, 0.00, 0.00, 0.00],  # A1/A0 = 1
+        [0.05, 0.07, 0.12, 0.18, 0.22, 0.25, 0.25],  # 2
+        [0.06, 0.12, 0.22, 0.38, 0.50, 0.56, 0.56],  # 4
+        [0.06, 0.13, 0.25, 0.43, 0.60, 0.69, 0.69],  # 6
+        [0.06, 0.14, 0.27, 0.48, 0.66, 0.81, 0.81],  # 10
+    ],
+    reference="inlet",
+))
+
+# opposed blade damper (rectangular): C vs blade angle (0 = fully open)
+register(CoefficientTable(
+    "damper_opposed_blade",
+    [("blade_angle", [0, 10, 20, 30, 40, 50, 60, 70, 80])],
+    [0.52, 0.79, 1.91, 3.91, 10.9, 32.0, 113, 334, 1000],
+))
+
+# butterfly damper (round): C vs blade angle (0 = fully open)
+register(CoefficientTable(
+    "damper_butterfly",
+    [("blade_angle", [0, 10, 20, 30, 40, 50, 60, 70])],
+    [0.20, 0.52, 1.50, 4.50, 11.0, 29.0, 108, 625],
+))
+
+
+# SINGLE FITTING
+# pressure loss (Pa) of one fitting on a Duct -- C x the duct's own velocity pressure
+# so pass the duct the table is referenced to (the inlet duct for an expansion, the outlet for a contraction)
+def fitting_loss(duct, fitting_type: str, **parameters):
+    table = table_for(fitting_type)
+    return table.lookup(*table.point(parameters)) * duct.calculate_dynamic_pressure_drop()
+
+
+# BATCH
+# C and loss for a batch of fittings
+# fitting_types and points are lists (one point tuple per fitting, in the table's axis order)
+# flow_rates (L/s), areas (m²) and densities (kg/m3) are lists or single values (broadcast),
+# for the section each table's C is referenced to
+# identical (type, point) pairs are only interpolated once
+def fitting_losses(fitting_types: list, points: list, flow_rates, areas, densities):
+    _, _, flow_rates, areas, densities = broadcast(list(fitting_types), list(points), flow_rates, areas, densities)
+
+    known = {}  # (type, point) -> C
+    coefficients = []
+    for fitting_type, point in zip(fitting_types, points):
+        key = (fitting_type, point)
+        C = known.get(key)
+        if C is None:
+            C = known[key] = table_for(fitting_type).lookup(*point)
+        coefficients.append(C)
+
+    # velocity pressure, same as Duct.calculate_dynamic_pressure_drop (Pd = 0.5 p V², V = Q/A)
+    dynamic = [0.5 * p * (Q * 1e-3 / A)**2 for Q, A, p in zip(flow_rates, areas, densities)]
+    return {
+        "coefficient": coefficients,  # N/A
+        "dynamic_pressure": dynamic,  # Pa
+        "pressure_loss": [C * Pd for C, Pd in zip(coefficients, dynamic)],  # Pa
+    }
+
+
+# NETWORK
+# one fitting sitting on a network segment -- the segment its outlet feeds (for a tee, the branch or
+# straight through run it leads into), and its loss is counted in that segment's run
+# C is applied to that segment's velocity pressure, unless the table is referenced to the inlet
+# (expansions) -- then it's the parent segment's, and a fitting like that can't sit on a root segment
+class Fitting:
+    def __init__(self, fitting_id: str, fitting_type: str, segment_id: str, **parameters):
+        self.fitting_id = fitting_id  # tag from the schedule
+        self.fitting_type = fitting_type  # key into FITTINGS
+        self.segment_id = segment_id  # the duct run it's on
+        self.point = table_for(fitting_type).point(parameters)  # lookup point, checked up front
+
+
+# fitting losses summed per segment (Pa) -- each segment's velocity pressure is worked out once
+def network_fitting_losses(network, fittings):
+    positions = network.index()
+    parents = network.parent_indices()
+    segments = list(network.segments.values())
+    density = air_density(network.temperature, network.relative_humidity, network.elevation)
+    dynamic = [0.5 * density * (s.flow_rate * 1e-3 / section(s.duct_type, s.width, s.height, s.diameter)[0])**2
+               for s in segments]  # Pd = 0.5 p V²
+
+    known = {}  # (type, point) -> C
+    losses = dict.fromkeys(network.segments, 0.0)
+    for fitting in fittings:
+        table = FITTINGS[fitting.fitting_type]
+        key = (fitting.fitting_type, fitting.point)
+        C = known.get(key)
+        if C is None:
+            C = known[key] = table.lookup(*fitting.point)
+        try:
+            position = positions[fitting.segment_id]
+        except KeyError:
+            raise ValueError(f"{fitting.fitting_id}: segment {fitting.segment_id} not found!") from None
+        if REFERENCES[table.reference] == "parent":  # C is on the inlet side, one segment up
+            position = parents[position]
+            if position < 0:
+                raise ValueError(f"{fitting.fitting_id}: {fitting.fitting_type} is referenced to its inlet "
+                                 f"velocity pressure, but segment {fitting.segment_id} has nothing upstream!")
+        losses[fitting.segment_id] += C * dynamic[position]
+    return losses
+
+
+# Main guard
+# This runs only when fittings.py is executed directly
+if __name__ == "__main__":
+    import random  # synthetic fittings
+    import time  # timing
+    from duct import Duct  # single duct reference
+    from network import DuctNetwork, DuctSegment  # demo network
+
+    # one elbow on a single duct, and a few table lookups between the tabulated points
+    duct = Duct("Round", 300, 0.09, 25, 50, 100, 1, 2.1, diameter=250)
+    print(f"Pd {duct.calculate_dynamic_pressure_drop():.2f} Pa, 90° r/D=1.25 elbow "
+          f"{fitting_loss(duct, 'elbow_round', radius_ratio=1.25, angle=90):.2f} Pa")
+    print(f"Rect elbow r/W=0.6 H/W=0.75 67.5°: C = {FITTINGS['elbow_rectangular'].lookup(0.6, 0.75, 67.5):.3f}")
+    damper = FITTINGS["damper_opposed_blade"]
+    print(f"Opposed blade damper C=20 -> {damper.setting_for(20):.1f}° (check: {damper.lookup(damper.setting_for(20)):.1f})")
+
+    # batch: 100k fittings with continuous (all different) parameters
+    rng = random.Random(1)
+    count = 100_000
+    choices = [("elbow_round", 2), ("elbow_rectangular", 3), ("tee_branch", 2), ("contraction", 2),
+               ("damper_opposed_blade", 1)]
+    types, points = [], []
+    for _ in range(count):
+        fitting_type, axes = rng.choice(choices)
+        types.append(fitting_type)
+        points.append(tuple(rng.uniform(0.3, 90) if n else rng.uniform(0.3, 2.0) for n in range(axes)))
+    flows = [rng.uniform(50, 2000) for _ in range(count)]
+    areas = [rng.uniform(0.02, 0.5) for _ in range(count)]
+
+    start = time.perf_counter()
+    results = fitting_losses(types, points, flows, areas, air_density(25, 50, 100))
+    print(f"{count} unique fittings in {time.perf_counter() - start:.3f} s, "
+          f"total {sum(results['pressure_loss']) / 1000:.1f} kPa")
+
+    # network: 1000 branches with 100 fittings each (catalogue sizes, so lots of repeats)
+    network = DuctNetwork()
+    network.add(DuctSegment("MAIN", "Rectangular", 20_000, width=2000, height=1000, length=60))
+    for branch in range(1000):
+        network.add(DuctSegment(f"B{branch}", "Round", 20, diameter=160, length=5, parent="MAIN"))
+    fittings = [Fitting(f"F{n}", "elbow_round", f"B{n % 1000}", radius_ratio=rng.choice([1.0, 1.5]),
+                        angle=rng.choice([45, 90])) for n in range(count)]
+    start = time.perf_counter()
+    losses = network_fitting_losses(network, fittings)
+    print(f"{count} network fittings in {time.perf_counter() - start:.3f} s, B0 fittings {losses['B0']:.2f} Pa")
+
+    # expansion into a bigger branch: C goes on the (faster) inlet Pd of the segment feeding it
+    network.add(DuctSegment("BIG", "Round", 20, diameter=400, length=5, parent="B0"))
+    expansion = Fitting("X1", "expansion", "BIG", area_ratio=(400 / 160)**2, angle=30)
+    losses = network_fitting_losses(network, [expansion])
+    print(f"Expansion 160 -> 400 mm: {losses['BIG']:.2f} Pa on the 160 mm Pd")
+    try:
+        network_fitting_losses(network, [Fitting("X2", "expansion", "MAIN", area_ratio=2, angle=30)])
+    except ValueError as e:
+        print(e)
@@ -0,0 +1,135 @@
+# friction_chart.py
+# the classic duct friction chart -- Pa/m against flow (log-log) with lines of constant size and velocity
+# this part only works out the geometry (canvas coordinates), ui.py does the drawing
+# curves come from one batched evaluation of the duct chain over a flow/size grid for the current
+# ambient conditions, and are cached so they're only regenerated when those conditions change
+
+import math  # for maths like logs etc
+
+from duct_batch import air_density, dynamic_viscosity, evaluate, section  # batched duct chain
+
+# chart grid
+DIAMETERS = [100, 125, 160, 200, 250, 315, 400, 500, 630, 800, 1000, 1250]  # round duct sizes (mm)
+VELOCITIES = [2, 3, 4, 5, 6, 8, 10, 12, 15]  # lines of constant velocity (m/s)
+FLOW_RANGE = (10, 20_000)  # x axis (L/s)
+PRESSURE_RANGE = (0.1, 20)  # y axis (Pa/m)
+POINTS_PER_SIZE = 40  # flow points along each size line
+
+
+# this is our friction chart class
+class FrictionChart:
+    def __init__(self, width: float, height: float, margin_left: float = 38, margin_bottom: float = 18,
+                 margin_top: float = 8, margin_right: float = 8):
+        # plot area inside the canvas
+        self.left = margin_left
+        self.right = width - margin_right
+        self.top = margin_top
+        self.bottom = height - margin_bottom
+        self._cache_key = None  # conditions the cached layers were built for
+        self._cache = None  # cached layers
+
+    # CANVAS MAPPING (log-log)
+    def x(self, flow: float):
+        low, high = FLOW_RANGE
+        return self.left + (self.right - self.left) * math.log10(flow / low) / math.log10(high / low)
+
+    def y(self, pressure: float):
+        low, high = PRESSURE_RANGE
+        return self.bottom - (self.bottom - self.top) * math.log10(pressure / low) / math.log10(high / low)
+
+    # is a (flow, Pa/m) point on the chart?
+    def in_range(self, flow: float, pressure: float):
+        return FLOW_RANGE[0] <= flow <= FLOW_RANGE[1] and PRESSURE_RANGE[0] <= pressure <= PRESSURE_RANGE[1]
+
+    # LAYERS
+    # curve layers for the given conditions -- cached, only rebuilt when the conditions change
+    # returns (layers, rebuilt) so the UI knows whether it has to redraw
+    def layers(self, roughness: float, temperature: float, relative_humidity: float, elevation: float):
+        key = (roughness, temperature, relative_humidity, elevation)
+        if key == self._cache_key:
+            return self._cache, False
+        self._cache = self._build(*key)
+        self._cache_key = key
+        return self._cache, True
+
+    # one batch for every size line point and every velocity line point
+    def _build(self, roughness, temperature, relative_humidity, elevation):
+        density = air_density(temperature, relative_humidity, elevation)
+        viscosity = dynamic_viscosity(temperature)
+        sections = {D: section("Round", diameter=D) for D in DIAMETERS}
+
+        # size lines: log spaced flows along each diameter
+        low, high = FLOW_RANGE
+        flows = [low * (high / low)**(i / (POINTS_PER_SIZE - 1)) for i in range(POINTS_PER_SIZE)]
+        grid = [(D, Q) for D in DIAMETERS for Q in flows]
+        # velocity lines: each velocity through every diameter (Q = V.A)
+        grid += [(D, V * sections[D][0] * 1000) for V in VELOCITIES for D in DIAMETERS]
+
+        results = evaluate([sections[D][0] for D, _ in grid], [sections[D][1] for D, _ in grid],
+                           [Q for _, Q in grid], roughness, density, viscosity)
+        pressures = results["static_pressure_drop"]
+
+        # split the batch back into lines, clipped to the plot
+        size_lines = []
+        for n, D in enumerate(DIAMETERS):
+            start = n * POINTS_PER_SIZE
+            points = [(Q, P) for (_, Q), P in zip(grid[start:start + POINTS_PER_SIZE],
+                                                 pressures[start:start + POINTS_PER_SIZE]) if self.in_range(Q, P)]
+            if len(points) > 1:
+                size_lines.append((f"Ø{D}", self._polyline(points)))
+
+        velocity_lines = []
+        offset = len(DIAMETERS) * POINTS_PER_SIZE
+        for n, V in enumerate(VELOCITIES):
+            start = offset + n * len(DIAMETERS)
+            points = [(Q, P) for (_, Q), P in zip(grid[start:start + len(DIAMETERS)],
+                                                 pressures[start:start + len(DIAMETERS)]) if self.in_range(Q, P)]
+            if len(points) > 1:
+                velocity_lines.append((f"{V} m/s", self._polyline(points)))
+
+        return {"size_lines": size_lines, "velocity_lines": velocity_lines, "axes": self._axes()}
+
+    # (flow, Pa/m) points -> flat canvas coordinate list for create_line
+    def _polyline(self, points):
+        coords = []
+        for Q, P in points:
+            coords += [self.x(Q), self.y(P)]
+        return coords
+
+    # frame + decade gridlines with labels -> (lines, labels)
+    def _axes(self):
+        lines = [[self.left, self.top, self.right, self.top, self.right, self.bottom,
+                  self.left, self.bottom, self.left, self.top]]
+        labels = []
+        for flow in (10, 100, 1000, 10_000):
+            lines.append([self.x(flow), self.top, self.x(flow), self.bottom])
+            labels.append((self.x(flow), self.bottom + 8, f"{flow:g}"))
+        for pressure in (0.1, 1, 10):
+            lines.append([self.left, self.y(pressure), self.right, self.y(pressure)])
+            labels.append((self.left - 16, self.y(pressure), f"{pressure:g}"))
+        labels.append((self.right - 22, self.bottom + 8, "L/s"))
+        labels.append((self.left - 18, self.top + 6, "Pa/m"))
+        return lines, labels
+
+    # OPERATING POINT
+    # canvas position of the current duct (flow L/s, static Pa/m), clamped to the plot edges
+    def marker(self, flow: float, pressure: float):
+        flow = min(max(flow, FLOW_RANGE[0]), FLOW_RANGE[1])
+        pressure = min(max(pressure, PRESSURE_RANGE[0]), PRESSURE_RANGE[1])
+        return self.x(flow), self.y(pressure)
+
+
+# Main guard
+# This runs only when friction_chart.py is executed directly
+if __name__ == "__main__":
+    import time  # timing
+
+    chart = FrictionChart(500, 250)
+    start = time.perf_counter()
+    layers, rebuilt = chart.layers(0.09, 25, 50, 100)
+    print(f"Built {len(layers['size_lines'])} size lines + {len(layers['velocity_lines'])} velocity lines "
+          f"in {1000 * (time.perf_counter() - start):.1f} ms")
+    start = time.perf_counter()
+    _, rebuilt = chart.layers(0.09, 25, 50, 100)
+    print(f"Same conditions again: rebuilt={rebuilt} in {1000 * (time.perf_counter() - start):.3f} ms")
+    print(f"Marker for 300 L/s @ 0.655 Pa/m: {chart.marker(300, 0.655)}")
@@ -0,0 +1,185 @@
+# jobs.py
+# background job execution for the UI
+# heavy calculations run on a worker thread so the tkinter window never freezes
+# results come back through a thread-safe queue that the Tk thread polls with after()
+
+import queue  # thread-safe FIFO between the worker and the Tk thread
+import threading  # worker threads + cancel flags
+
+
+# raised inside a job function when the user has cancelled it
+# job functions call job.check_cancelled() between units of work to bail out early
+class JobCancelled(Exception):
+    pass
+
+
+# a single unit of background work
+# the job function receives this object as its first argument so it can report progress and check for cancellation
+class Job:
+    def __init__(self,
+                 func,
+                 args: tuple = (),
+                 kwargs: dict | None = None,
+                 on_result=None,
+                 on_progress=None,
+                 on_error=None,
+                 on_cancel=None,
+                 ):
+        self.func = func  # callable(job, *args, **kwargs) run on the worker
+        self.args = args  # positional args for func
+        self.kwargs = kwargs or {}  # keyword args for func
+
+        # callbacks -- these are ONLY ever called on the Tk thread
+        self.on_result = on_result  # called with func's return value
+        self.on_progress = on_progress  # called with (done, total, message)
+        self.on_error = on_error  # called with the exception raised by func
+        self.on_cancel = on_cancel  # called with no args once the worker has stopped
+
+        self._cancel_event = threading.Event()  # set by cancel(), read by the worker
+        self._messages = None  # the runner's queue, attached on submit
+
+    # ask the job to stop -- safe to call from any thread
+    def cancel(self):
+        self._cancel_event.set()
+
+    # has cancel() been called?
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    # call this from the job function between chunks of work
+    def check_cancelled(self):
+        if self._cancel_event.is_set():
+            raise JobCancelled()
+
+    # call this from the job function to push progress to the UI
+    # NOTE: never touch tkinter from here, we're on the worker thread!
+    def report_progress(self, done: int, total: int, message: str = ""):
+        if self._messages is not None:
+            self._messages.put(("progress", self, (done, total, message)))
+
+
+# owns the worker threads and the message queue
+# the Tk thread polls the queue with after() and dispatches the job callbacks
+class JobRunner:
+    def __init__(self, root, poll_ms: int = 50):
+        self._root = root  # Tk root (or any widget) that provides after()
+        self._poll_ms = poll_ms  # how often to drain the queue (ms)
+        self._messages = queue.Queue()  # worker -> Tk thread messages
+        self._active = set()  # jobs that haven't reported back yet
+        self._polling = False  # is an after() callback already scheduled?
+
+    # start a job on a new worker thread
+    # func(job, *args, **kwargs) runs on the worker, callbacks run on the Tk thread
+    def submit(self, func, *args, on_result=None, on_progress=None, on_error=None, on_cancel=None, **kwargs):
+        job = Job(func, args, kwargs, on_result, on_progress, on_error, on_cancel)
+        job._messages = self._messages  # so report_progress() knows where to post
+        self._active.add(job)
+
+        # daemon thread so an abandoned job doesn't keep the app alive after close()
+        worker = threading.Thread(target=self._run, args=(job,), daemon=True)
+        worker.start()
+
+        self._schedule_poll()  # make sure someone is listening for the result
+        return job
+
+    # cancel every running job (e.g. on window close or a new calculation)
+    def cancel_all(self):
+        for job in list(self._active):
+            job.cancel()
+
+    # is anything still running?
+    @property
+    def busy(self):
+        return bool(self._active)
+
+    # WORKER THREAD
+    # runs the job function and posts exactly one final message to the queue
+    def _run(self, job):
+        try:
+            job.check_cancelled()  # cancelled before we even started
+            result = job.func(job, *job.args, **job.kwargs)
+            job.check_cancelled()  # don't hand back results the user no longer wants
+            self._messages.put(("result", job, result))
+        except JobCancelled:
+            self._messages.put(("cancelled", job, None))
+        except Exception as e:  # any failure is handed to the Tk thread to display
+            self._messages.put(("error", job, e))
+
+    # TK THREAD
+    # schedule the next poll if one isn't already pending
+    def _schedule_poll(self):
+        if not self._polling:
+            self._polling = True
+            self._root.after(self._poll_ms, self._poll)
+
+    # drain everything currently in the queue and dispatch callbacks
+    def _poll(self):
+        self._polling = False
+        while True:
+            try:
+                kind, job, payload = self._messages.get_nowait()
+            except queue.Empty:
+                break  # nothing left this round
+
+            match (kind):
+                case "progress":
+                    # drop stale progress from a job that's been cancelled
+                    if job.on_progress is not None and not job.cancelled:
+                        job.on_progress(*payload)
+                case "result":
+                    self._active.discard(job)
+                    if job.cancelled:  # cancelled after it finished, hand back nothing
+                        if job.on_cancel is not None:
+                            job.on_cancel()
+                    elif job.on_result is not None:
+                        job.on_result(payload)
+                case "error":
+                    self._active.discard(job)
+                    if job.on_error is not None:
+                        job.on_error(payload)
+                case "cancelled":
+                    self._active.discard(job)
+                    if job.on_cancel is not None:
+                        job.on_cancel()
+
+        # keep polling while anything is still running
+        if self._active:
+            self._schedule_poll()
+
+
+# Main guard
+# This runs only when jobs.py is executed directly
+if __name__ == "__main__":
+    import time  # for the fake workload
+    from tkinter import Tk  # only need a root for after()
+
+    root = Tk()
+    root.withdraw()  # no window needed for the demo
+    runner = JobRunner(root)
+
+    # a fake long calculation that reports progress and honours cancellation
+    def slow_sum(job, n):
+        total = 0
+        for i in range(n):
+            job.check_cancelled()
+            total += i
+            time.sleep(0.001)
+            if i % 100 == 0:
+                job.report_progress(i, n, "summing")
+        return total
+
+    finished = []  # collects callback output
+    runner.submit(slow_sum, 500,
+                  on_progress=lambda done, total, msg: print(f"{msg}: {done}/{total}"),
+                  on_result=lambda r: finished.append(f"result: {r}"))
+    cancelled = runner.submit(slow_sum, 10_000, on_cancel=lambda: finished.append("cancelled"))
+    root.after(100, cancelled.cancel)  # cancel the second job part way through
+
+    # pump the Tk event loop until both jobs report back
+    while runner.busy:
+        root.update()
+        time.sleep(0.01)
+    for line in finished:
+        print(line)
+    root.destroy()
@@ -2,11 +2,16 @@
 # main application loop
 # We're using an MVC system -- main runs the application loop for the modeller, viewer and controller
 
+import sys  # command line args
+
 from ui import UI  # our tkinter GUI
 
 def main():
+    # optional project file path as the first argument, e.g. python3 main.py plant_room.duct
+    project_path = sys.argv[1] if len(sys.argv) > 1 else None
+
     # create tkinter window
-    window = UI(500, 250)  # set width & height in pixels
+    window = UI(500, 250, project_path=project_path)  # set width & height in pixels
 
     # call close method on clicking X
     window.wait_for_close()
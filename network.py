@@ -0,0 +1,186 @@
+# network.py
+# duct networks -- a tree of duct segments from the fan (root) out to the terminals (leaves)
+# each segment is one straight run with its own size, flow and length
+
+from duct_batch import air_density, dynamic_viscosity, evaluate, section  # batched duct chain
+from schedule import normalise_column, normalise_row, read_schedule  # schedule rows -> inputs
+
+
+# one straight duct run in the network
+class DuctSegment:
+    def __init__(self,
+                 segment_id: str,
+                 duct_type: str,
+                 flow_rate: float,
+                 width: int | None = None,
+                 height: int | None = None,
+                 diameter: int | None = None,
+                 length: float = 1.0,
+                 roughness: float = 0.09,
+                 parent: str | None = None,
+                 u_value: float | None = None,
+                 surrounding_temperature: float | None = None,
+                 ):
+        self.segment_id = segment_id  # tag from the schedule
+        self.duct_type = duct_type  # rectangular or round
+        self.flow_rate = flow_rate  # design flow rate (L/s)
+        self.width = width  # rectangular: duct width (mm)
+        self.height = height  # rectangular: duct height (mm)
+        self.diameter = diameter  # round: diameter (mm)
+        self.length = length  # run length (m)
+        self.roughness = roughness  # absolute roughness (mm)
+        self.parent = parent  # upstream segment id, None = connected to the fan
+
+        # thermal (None = use the thermal model's defaults)
+        self.u_value = u_value  # duct wall + insulation U-value (W/m².K of duct surface)
+        self.surrounding_temperature = surrounding_temperature  # air around the duct (°C)
+
+
+# this is our network class -- segments are kept in upstream-first order
+# so a single forward pass always sees a parent before its children
+class DuctNetwork:
+    def __init__(self, temperature: float = 25, relative_humidity: float = 50, elevation: float = 100):
+        # design ambient conditions (same defaults as the UI)
+        self.temperature = temperature  # °C
+        self.relative_humidity = relative_humidity  # %
+        self.elevation = elevation  # m
+
+        self.segments = {}  # id -> DuctSegment, upstream first
+        self._children = {}  # id -> [child ids]
+
+    # add a segment -- its parent must already be in the network
+    def add(self, segment: DuctSegment):
+        if segment.segment_id in self.segments:
+            raise ValueError(f"Duplicate segment: {segment.segment_id}")
+        if segment.parent is not None and segment.parent not in self.segments:
+            raise ValueError(f"{segment.segment_id}: upstream segment {segment.parent} not found!")
+        self.segments[segment.segment_id] = segment
+        self._children[segment.segment_id] = []
+        if segment.parent is not None:
+            self._children[segment.parent].append(segment.segment_id)
+        return segment
+
+    def __len__(self):
+        return len(self.segments)
+
+    # downstream segments directly connected to this one
+    def children(self, segment_id: str):
+        return self._children[segment_id]
+
+    # terminals are the segments with nothing downstream
+    def terminals(self):
+        return [segment_id for segment_id, children in self._children.items() if not children]
+
+    # segment ids from the fan out to this segment
+    def path(self, segment_id: str):
+        path = []
+        while segment_id is not None:
+            path.append(segment_id)
+            segment_id = self.segments[segment_id].parent
+        return path[::-1]
+
+    # position of each segment in the upstream-first order (handy for list based batch passes)
+    def index(self):
+        return {segment_id: i for i, segment_id in enumerate(self.segments)}
+
+    # parent position for each segment (-1 = fan), same order as segments
+    def parent_indices(self):
+        positions = self.index()
+        return [positions[s.parent] if s.parent is not None else -1 for s in self.segments.values()]
+
+    # index run pressure (Pa) with every segment's flow scaled by each factor -- all factors in one batch
+    # index run = the fan -> terminal path with the highest sum of static Pa/m x length + exit velocity pressure
+    def index_pressures(self, scales=(1.0,)):
+        segments = list(self.segments.values())
+        parents = self.parent_indices()
+        terminal = [not self._children[s.segment_id] for s in segments]
+        density = air_density(self.temperature, self.relative_humidity, self.elevation)
+        viscosity = dynamic_viscosity(self.temperature)
+
+        # one batch: every segment at every scale (segment major)
+        sections = [section(s.duct_type, s.width, s.height, s.diameter) for s in segments]
+        results = evaluate([a for a, _ in sections for _ in scales],
+                           [Dh for _, Dh in sections for _ in scales],
+                           [s.flow_rate * k for s in segments for k in scales],
+                           [s.roughness for s in segments for _ in scales],
+                           density, viscosity)
+        static = results["static_pressure_drop"]
+        dynamic = results["dynamic_pressure_drop"]
+
+        # walk the tree once per scale (segments are upstream first, so parents are always done)
+        pressures = []
+        count = len(scales)
+        for j in range(count):
+            run = [0.0] * len(segments)
+            worst = 0.0
+            for i, segment in enumerate(segments):
+                k = i * count + j
+                run[i] = (run[parents[i]] if parents[i] >= 0 else 0.0) + static[k] * segment.length
+                if terminal[i]:
+                    worst = max(worst, run[i] + dynamic[k])
+            pressures.append(worst)
+        return pressures
+
+    # total flow leaving the fan (L/s)
+    def fan_flow(self):
+        return sum(s.flow_rate for s in self.segments.values() if s.parent is None)
+
+    # build a network from a schedule file with extra "Length" (m) and "Parent"/"Upstream" columns
+    # (and optional "U Value" / "Surrounding Temperature" columns for the thermal model)
+    # rows can be in any order, they're re-ordered upstream first
+    @classmethod
+    def from_schedule(cls, path: str):
+        pending = {}  # id -> segment waiting to be added
+        first_inputs = None
+        for number, row in enumerate(read_schedule(path), start=2):  # row 1 = header
+            duct_id, inputs = normalise_row(row, number)
+            first_inputs = first_inputs or inputs
+            extra = {normalise_column(column): value for column, value in row.items() if column is not None}
+            parent = extra.get("parent") or extra.get("upstream")
+            length = extra.get("length") or extra.get("length_(m)")
+            u_value = extra.get("u_value") or extra.get("u-value")
+            surrounding = extra.get("surrounding_temperature") or extra.get("surrounding")
+            pending[duct_id] = DuctSegment(
+                duct_id, inputs["duct_type"], inputs["flow_rate"],
+                inputs["width"], inputs["height"], inputs["diameter"],
+                length=float(length) if length not in (None, "") else 1.0,
+                roughness=inputs["roughness"],
+                parent=str(parent).strip() if parent not in (None, "") else None,
+                u_value=float(u_value) if u_value not in (None, "") else None,
+                surrounding_temperature=float(surrounding) if surrounding not in (None, "") else None,
+            )
+
+        # ambient conditions come from the schedule (first row) -- they're site wide
+        network = cls()
+        if first_inputs is not None:
+            network.temperature = first_inputs["temperature"]
+            network.relative_humidity = first_inputs["relative_humidity"]
+            network.elevation = first_inputs["elevation"]
+
+        # add parents before children (walk up from each segment until we hit one that's placed)
+        for segment_id in list(pending):
+            chain = []
+            while segment_id in pending:
+                chain.append(segment_id)
+                segment_id = pending[segment_id].parent
+                if segment_id in chain:
+                    raise ValueError(f"Loop in network at segment {segment_id}")
+            for segment_id in reversed(chain):
+                network.add(pending.pop(segment_id))
+        return network
+
+
+# Main guard
+# This runs only when network.py is executed directly
+if __name__ == "__main__":
+    # fan -> main -> two branches
+    network = DuctNetwork()
+    network.add(DuctSegment("MAIN", "Rectangular", 1000, width=600, height=400, length=20))
+    network.add(DuctSegment("BR-1", "Round", 400, diameter=315, length=12, parent="MAIN"))
+    network.add(DuctSegment("BR-2", "Round", 600, diameter=355, length=8, parent="MAIN"))
+
+    print(f"Segments: {list(network.segments)}")
+    print(f"Terminals: {network.terminals()}")
+    print(f"Path to BR-2: {network.path('BR-2')}")
+    print(f"Parent indices: {network.parent_indices()}")
+    print(f"Index run at 50/100/120% flow: {[round(p, 1) for p in network.index_pressures([0.5, 1.0, 1.2])]} Pa")
@@ -0,0 +1,238 @@
+# project.py
+# project files -- keeps a whole system of ducts (inputs + cached results) on disk
+# format = compacted snapshot + append-only edit journal
+#   <name>.duct          -> snapshot: header line then one JSON line per duct
+#   <name>.duct.journal  -> journal: one JSON line per edit since the snapshot
+# saving an edit only appends one line to the journal (never rewrites the whole file)
+# loading reads the snapshot once and replays the (short) journal tail on top
+
+import json  # snapshot + journal lines are JSON
+import os  # atomic replace + file checks
+
+PROJECT_VERSION = 1  # bump if the line layout ever changes
+
+
+# raised when a project file is unreadable (wrong version, corrupt snapshot etc.)
+class ProjectError(Exception):
+    pass
+
+
+# this is our project class -- one instance per open project file
+class Project:
+    def __init__(self, path: str, compact_every: int = 1000):
+        self.path = path  # snapshot path
+        self.journal_path = path + ".journal"  # journal sits next to the snapshot
+        self.compact_every = compact_every  # minimum journal length before auto compaction
+
+        # in-memory state, rebuilt on load
+        # id -> {"inputs": {...}, "results": {...} | None}
+        self.ducts = {}
+        self._seq = 0  # sequence number of the last applied edit
+        self._journal_length = 0  # edits in the journal since the last snapshot
+        self._journal = None  # open append handle
+
+        self._load()
+
+    # LOADING
+    # snapshot first, then replay any journal entries newer than it
+    def _load(self):
+        snapshot_seq = 0
+
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                header = json.loads(f.readline() or "{}")
+                if header.get("version") != PROJECT_VERSION:
+                    raise ProjectError(f"Unsupported project file: {self.path}")
+                snapshot_seq = header.get("seq", 0)
+                for line in f:
+                    record = json.loads(line)
+                    self.ducts[record["id"]] = {"inputs": record["inputs"], "results": record.get("results")}
+        self._seq = snapshot_seq
+
+        if os.path.exists(self.journal_path):
+            good = 0  # byte offset just past the last complete journal line
+            with open(self.journal_path, "rb") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break  # torn last line from a crash mid-append
+                    try:
+                        entry = json.loads(line)
+                    except (json.JSONDecodeError, UnicodeDecodeError):
+                        break  # torn / garbage line, everything after it is garbage too
+                    good += len(line)
+                    # entries at or below the snapshot seq were already compacted in
+                    # (happens if we crashed between writing the snapshot and truncating the journal)
+                    if entry["seq"] <= snapshot_seq:
+                        continue
+                    self._apply(entry)
+                    self._journal_length += 1
+
+            # cut the torn tail off now -- otherwise the next append lands on the end of the
+            # partial line, and that line (and every edit after it) fails to load next time
+            if good < os.path.getsize(self.journal_path):
+                with open(self.journal_path, "r+b") as f:
+                    f.truncate(good)
+                    f.flush()
+                    os.fsync(f.fileno())
+
+    # apply one journal entry to the in-memory state
+    def _apply(self, entry):
+        match (entry["op"]):
+            case "put":  # new duct or changed inputs -- cached results go with it
+                self.ducts[entry["id"]] = {"inputs": entry["inputs"], "results": entry.get("results")}
+            case "results":  # results computed for existing inputs
+                if entry["id"] in self.ducts:
+                    self.ducts[entry["id"]]["results"] = entry["results"]
+            case "delete":
+                self.ducts.pop(entry["id"], None)
+            case _:
+                raise ProjectError(f"Unknown journal operation: {entry['op']}")
+        self._seq = entry["seq"]
+
+    # EDITING
+    # every edit = apply in memory + append one line to the journal
+    def _append(self, entry):
+        entry["seq"] = self._seq + 1
+        self._apply(entry)
+
+        if self._journal is None:
+            self._journal = open(self.journal_path, "a", encoding="utf-8")
+        self._journal.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        self._journal.flush()  # edit is on disk once this returns
+        self._journal_length += 1
+
+        # periodic compaction keeps the journal tail (and so load time) short
+        if self._compact_due():
+            self.compact()
+
+    # journal long enough to be worth rewriting the snapshot for
+    # (at least compact_every, and half the project so big projects aren't rewritten every few edits)
+    def _compact_due(self):
+        return self._journal_length >= max(self.compact_every, len(self.ducts) // 2)
+
+    # add or update a duct -- results are optional (pass them if you've already solved it)
+    # changing inputs without new results drops the stale cached results
+    def put(self, duct_id: str, inputs: dict, results: dict | None = None):
+        current = self.ducts.get(duct_id)
+        if current is not None and current["inputs"] == inputs:
+            if results is None or results == current["results"]:
+                return  # nothing changed, don't grow the journal
+            self._append({"op": "results", "id": duct_id, "results": results})
+            return
+        self._append({"op": "put", "id": duct_id, "inputs": inputs, "results": results})
+
+    # store results for a duct's current inputs
+    def set_results(self, duct_id: str, results: dict):
+        if duct_id not in self.ducts:
+            raise KeyError(duct_id)
+        self._append({"op": "results", "id": duct_id, "results": results})
+
+    # remove a duct from the project
+    def delete(self, duct_id: str):
+        if duct_id in self.ducts:
+            self._append({"op": "delete", "id": duct_id})
+
+    # cached results for a duct, None if never solved or if the inputs differ
+    def cached_results(self, duct_id: str, inputs: dict | None = None):
+        duct = self.ducts.get(duct_id)
+        if duct is None:
+            return None
+        if inputs is not None and duct["inputs"] != inputs:
+            return None  # inputs changed since the results were stored
+        return duct["results"]
+
+    # solve every duct without cached results (only those -- solved ducts are reused)
+    # controller = DuctController, inputs are its duct_properties() keyword args
+    def solve(self, controller):
+        solved = 0
+        for duct_id, duct in list(self.ducts.items()):
+            if duct["results"] is None:
+                self.set_results(duct_id, controller.duct_properties(**duct["inputs"]))
+                solved += 1
+        return solved
+
+    # COMPACTION
+    # write a fresh snapshot of the current state, then start a new empty journal
+    def compact(self):
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"version": PROJECT_VERSION, "seq": self._seq, "count": len(self.ducts)}) + "\n")
+            for duct_id, duct in self.ducts.items():
+                record = {"id": duct_id, "inputs": duct["inputs"], "results": duct["results"]}
+                f.write(json.dumps(record, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())  # snapshot must be durable before we drop the journal
+        os.replace(temp_path, self.path)  # atomic swap, readers see old or new, never half
+
+        # journal entries are now in the snapshot -- start over
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        open(self.journal_path, "w").close()
+        self._journal_length = 0
+
+    # release the journal handle -- compacting first only if the journal is due for it anyway
+    # (a short journal costs next to nothing to replay, rewriting the snapshot for it would)
+    def close(self):
+        if self._compact_due():
+            self.compact()
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+
+# Main guard
+# This runs only when project.py is executed directly
+if __name__ == "__main__":
+    import tempfile  # throwaway folder for the demo
+    import time  # load timing
+    from controller import DuctController  # to solve the ducts
+
+    folder = tempfile.mkdtemp()
+    path = os.path.join(folder, "demo.duct")
+    controller = DuctController()
+
+    # base inputs for each test duct
+    base = {"duct_type": "Rectangular", "flow_rate": 300, "roughness": 0.09, "temperature": 25,
+            "relative_humidity": 50, "elevation": 100, "noise_direction_factor": 1,
+            "noise_distance": 2.1, "width": 300, "height": 300, "diameter": None}
+
+    # create a project with 20k ducts, solve them, compact (one fresh snapshot after a bulk import)
+    project = Project(path)
+    for i in range(20_000):
+        project.put(f"D-{i:05d}", dict(base, flow_rate=100 + i % 900))
+    print(f"Solved {project.solve(controller)} ducts")
+    project.compact()
+    project.close()
+
+    # a few edits only append to the journal
+    project = Project(path)
+    project.put("D-00001", dict(base, flow_rate=555))
+    project.delete("D-00002")
+    print(f"Journal size after 2 edits: {os.path.getsize(project.journal_path)} bytes")
+    snapshot_time = os.path.getmtime(path)
+    project.close()
+    assert os.path.getmtime(path) == snapshot_time  # 2 edits aren't worth a new snapshot
+
+    # reopen -- cached results come straight back, only the edited duct needs solving
+    start = time.perf_counter()
+    reopened = Project(path)
+    print(f"Reloaded {len(reopened.ducts)} ducts in {time.perf_counter() - start:.3f} s")
+    print(f"Re-solved {reopened.solve(controller)} ducts")
+    reopened.close()
+
+    # crash mid-append: a torn last journal line is cut off on load, so later edits still land
+    crash_path = os.path.join(folder, "crash.duct")
+    project = Project(crash_path)
+    project.put("A", base)
+    project.put("B", base)
+    project._journal.write('{"op":"put","id":"C","inp')  # half written line, then the "crash"
+    project._journal.close()
+    project._journal = None
+    project = Project(crash_path)  # drops the torn C line
+    project.put("D", base)
+    project._journal.close()
+    project._journal = None
+    recovered = sorted(Project(crash_path).ducts)
+    assert recovered == ["A", "B", "D"], recovered
+    print(f"After a torn journal line: {recovered}")
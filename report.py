@@ -0,0 +1,338 @@
+# report.py
+# PDF reports -- the duct sketch plus a paged results table, no external libraries
+# pages are streamed to disk as the results come in: each page is written (and forgotten) as soon as it's
+# full, the only thing kept for the whole file is each object's byte offset for the xref table
+# (8 bytes an object), so memory stays flat however many ducts are in the report
+#
+# usage:
+#   python3 report.py schedule.csv [report.pdf]   -- report a schedule (CSV or .xlsx)
+#   python3 report.py                             -- page generation benchmark
+
+import array  # compact xref offsets
+import time  # report date
+import zlib  # page content compression (FlateDecode)
+
+from sketch import isometric_duct  # same sketch geometry as the UI canvas
+
+# PAGE LAYOUT (PDF points, 72 per inch, origin bottom left)
+PAGE_WIDTH = 595.28  # A4
+PAGE_HEIGHT = 841.89
+MARGIN = 40
+ROW_HEIGHT = 12
+FONT_SIZE = 7
+
+# sketch colours (canvas colour names -> RGB 0-1)
+COLOURS = {"lime": (0.0, 0.8, 0.0), "blue": (0.0, 0.0, 1.0), "red": (1.0, 0.0, 0.0), "black": (0.0, 0.0, 0.0)}
+
+# results table: (heading, width pt, result key or None for input columns)
+# result values come formatted with units from DuctController ("3.000 m/s") -- the unit moves to the heading
+REPORT_COLUMNS = [
+    ("Tag", 62, None),
+    ("Type", 52, None),
+    ("Size (mm)", 58, None),
+    ("Flow (L/s)", 40, None),
+    ("Velocity (m/s)", 50, "Velocity"),
+    ("Static (Pa/m)", 50, "Static Pressure Drop"),
+    ("Total (Pa/m)", 50, "Total Pressure Drop"),
+    ("Reynolds", 52, "Reynold's Number"),
+    ("Flow State", 51, "Flow State"),
+    ("SPL (dB)", 50, "Sound Pressure Level"),
+]
+
+
+# text -> PDF string literal bytes (WinAnsi covers ², ³, °, Ø)
+def pdf_string(text: str):
+    data = str(text).encode("cp1252", errors="replace")
+    return b"(" + data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+# cut text to roughly fit a width (Helvetica averages about half an em per character)
+def fit_text(text: str, width: float, size: float = FONT_SIZE):
+    limit = max(int(width / (size * 0.5)), 1)
+    text = str(text)
+    return text if len(text) <= limit else text[:limit - 1] + "~"
+
+
+# PAGE CONTENT
+# drawing operators for one page -- only ever one page of these in memory
+class PageContent:
+    def __init__(self):
+        self._parts = []
+
+    def text(self, x: float, y: float, text: str, size: float = FONT_SIZE, bold: bool = False):
+        self._parts.append(b"BT /F%d %g Tf %.2f %.2f Td %s Tj ET\n" % (2 if bold else 1, size, x, y, pdf_string(text)))
+
+    def line(self, x1: float, y1: float, x2: float, y2: float, colour=(0.0, 0.0, 0.0), width: float = 0.5):
+        self._parts.append(b"%.3f %.3f %.3f RG %.2f w %.2f %.2f m %.2f %.2f l S\n" % (*colour, width, x1, y1, x2, y2))
+
+    def rect(self, x: float, y: float, width: float, height: float, fill=(0.92, 0.92, 0.92)):
+        # q/Q so the fill colour doesn't carry over to the text drawn after it
+        self._parts.append(b"q %.3f %.3f %.3f rg %.2f %.2f %.2f %.2f re f Q\n" % (*fill, x, y, width, height))
+
+    def data(self):
+        return b"".join(self._parts)
+
+
+# PDF FILE
+# streaming writer: objects go straight to disk, offsets are kept for the xref table
+# fixed objects: 1 = catalog, 2 = page tree (both written at the end), 3/4 = fonts
+class PdfWriter:
+    def __init__(self, path: str, page_width: float = PAGE_WIDTH, page_height: float = PAGE_HEIGHT,
+                 compress: bool = True, title: str = ""):
+        self.path = path
+        self.page_width = page_width
+        self.page_height = page_height
+        self.compress = compress  # flate compress page content
+        self.title = title
+        self._offsets = array.array("Q", [0, 0])  # byte offset of each object (1 and 2 reserved)
+        self._pages = array.array("L")  # page object numbers, in order
+        self._file = open(path, "wb")
+        self._file.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")  # binary marker comment
+
+        self._object(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")  # 3
+        self._object(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>")  # 4
+
+    @property
+    def page_count(self):
+        return len(self._pages)
+
+    @property
+    def closed(self):
+        return self._file.closed
+
+    # write one object -- a new number unless it's one of the reserved ones
+    def _object(self, body: bytes, number: int | None = None):
+        if number is None:
+            self._offsets.append(0)
+            number = len(self._offsets)
+        self._offsets[number - 1] = self._file.tell()
+        self._file.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+        return number
+
+    # write a page (its content stream, then the page object) -- nothing is kept but the offsets
+    def add_page(self, content: bytes):
+        if self.compress:
+            content = zlib.compress(content)
+            header = b"<< /Length %d /Filter /FlateDecode >>" % len(content)
+        else:
+            header = b"<< /Length %d >>" % len(content)
+        stream = self._object(header + b"\nstream\n" + content + b"\nendstream")
+        page = self._object(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %.2f %.2f] "
+                            b"/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents %d 0 R >>"
+                            % (self.page_width, self.page_height, stream))
+        self._pages.append(page)
+
+    # page tree, catalog, xref table + trailer
+    def close(self):
+        if self.closed:
+            return
+        kids = b" ".join(b"%d 0 R" % page for page in self._pages)
+        self._object(b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(self._pages)), 2)
+        self._object(b"<< /Type /Catalog /Pages 2 0 R >>", 1)
+        info = self._object(b"<< /Title %s /Producer (Duct Calculator) /CreationDate (D:%s) >>"
+                            % (pdf_string(self.title), time.strftime("%Y%m%d%H%M%S").encode()))
+
+        xref = self._file.tell()
+        self._file.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(self._offsets) + 1))
+        for offset in self._offsets:
+            self._file.write(b"%010d 00000 n \n" % offset)
+        self._file.write(b"trailer\n<< /Size %d /Root 1 0 R /Info %d 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+                         % (len(self._offsets) + 1, info, xref))
+        self._file.close()
+
+
+# DUCT REPORT
+# this is our report class -- add() ducts in order, each page is written once it's full
+class DuctReport:
+    def __init__(self, path: str, title: str = "Duct Sizing Report", compress: bool = True):
+        self.title = title
+        self.writer = PdfWriter(path, compress=compress, title=title)
+        self.ducts = 0  # rows written
+        self.errors = 0  # rows that failed to solve
+        self._page = None  # page being filled
+        self._y = 0.0  # baseline of the next row on that page
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # one duct -> one table row (results = DuctController.duct_properties output)
+    def add(self, duct_id: str, inputs: dict, results: dict):
+        if self._page is None:
+            self._new_page(first=inputs)
+        elif self._y < MARGIN + ROW_HEIGHT:
+            self._finish_page()
+            self._new_page()
+
+        page = self._page
+        if self.ducts % 2:
+            page.rect(MARGIN, self._y - 3, PAGE_WIDTH - 2 * MARGIN, ROW_HEIGHT)  # row shading
+
+        cells = [duct_id, inputs.get("duct_type", ""), self._size(inputs), inputs.get("flow_rate", "")]
+        error = results.get("Error:") or results.get("Error")
+        x = MARGIN + 2
+        for n, (_, width, key) in enumerate(REPORT_COLUMNS):
+            if key is None:
+                page.text(x, self._y, fit_text(cells[n], width))
+            elif error is not None:
+                # failed duct -- the error runs across the result columns
+                page.text(x, self._y, fit_text(f"Error: {error}", PAGE_WIDTH - MARGIN - x), bold=True)
+                break
+            else:
+                value = str(results.get(key, ""))
+                page.text(x, self._y, fit_text(value.split(" ")[0] if key != "Flow State" else value, width))
+            x += width
+
+        self._y -= ROW_HEIGHT
+        self.ducts += 1
+        self.errors += error is not None
+
+    # finish the last page and the file -> summary dict
+    def close(self):
+        if self.writer.closed:
+            return self.summary()
+        if self._page is None:
+            self._new_page()  # empty report still gets its first page
+        self._finish_page()
+        self.writer.close()
+        return self.summary()
+
+    def summary(self):
+        return {"ducts": self.ducts, "errors": self.errors, "pages": self.writer.page_count}
+
+    # PAGES
+    def _new_page(self, first: dict | None = None):
+        page = self._page = PageContent()
+        top = PAGE_HEIGHT - MARGIN
+        page.text(MARGIN, top, self.title, size=12, bold=True)
+        page.text(PAGE_WIDTH - MARGIN - 60, top, time.strftime("%Y-%m-%d"), size=8)
+        top -= 16
+
+        if self.writer.page_count == 0:
+            top = self._draw_cover(page, top, first)
+
+        # table header
+        page.line(MARGIN, top, PAGE_WIDTH - MARGIN, top)
+        x = MARGIN + 2
+        for heading, width, _ in REPORT_COLUMNS:
+            page.text(x, top - 10, fit_text(heading, width), bold=True)
+            x += width
+        page.line(MARGIN, top - 14, PAGE_WIDTH - MARGIN, top - 14)
+        self._y = top - 24
+
+    # first page: the isometric sketch (vector paths, same geometry as the UI) + design conditions
+    def _draw_cover(self, page, top, first):
+        box_width, box_height = 220, 130  # sketch area (pt)
+        page.line(MARGIN, top, MARGIN + box_width, top, width=0.3)
+        page.line(MARGIN, top - box_height, MARGIN + box_width, top - box_height, width=0.3)
+        page.line(MARGIN, top, MARGIN, top - box_height, width=0.3)
+        page.line(MARGIN + box_width, top, MARGIN + box_width, top - box_height, width=0.3)
+        # canvas coordinates (y down) -> page coordinates (y up)
+        for (x1, y1), (x2, y2), colour in isometric_duct(box_width / 2, box_height / 2):
+            page.line(MARGIN + x1, top - y1, MARGIN + x2, top - y2, COLOURS.get(colour, COLOURS["black"]), width=2)
+
+        if first:
+            x = MARGIN + box_width + 20
+            y = top - 10
+            page.text(x, y, "Design conditions", size=9, bold=True)
+            for label, key, unit in (("Air temperature", "temperature", "°C"),
+                                     ("Relative humidity", "relative_humidity", "%"),
+                                     ("Elevation", "elevation", "m"),
+                                     ("Roughness", "roughness", "mm"),
+                                     ("Noise distance", "noise_distance", "m")):
+                y -= 12
+                page.text(x, y, f"{label}: {first.get(key, '')} {unit}", size=8)
+        return top - box_height - 16
+
+    def _finish_page(self):
+        self._page.text(PAGE_WIDTH / 2 - 15, MARGIN / 2, f"Page {self.writer.page_count + 1}", size=8)
+        self.writer.add_page(self._page.data())
+        self._page = None
+
+    @staticmethod
+    def _size(inputs):
+        if inputs.get("duct_type") == "Round":
+            return f"Ø{inputs.get('diameter')}"
+        if inputs.get("width") is None:
+            return ""
+        return f"{inputs.get('width')} x {inputs.get('height')}"
+
+
+# write a report from (duct id, inputs, results) entries -> summary dict
+# progress(done, total) is called after every page (total may be None when it isn't known)
+def write_report(path: str, entries, title: str = "Duct Sizing Report", total: int | None = None, progress=None):
+    with DuctReport(path, title) as report:
+        pages = 0
+        for duct_id, inputs, results in entries:
+            report.add(duct_id, inputs, results)
+            if progress is not None and report.writer.page_count != pages:
+                pages = report.writer.page_count
+                progress(report.ducts, total)
+    return report.summary()
+
+
+# solve a schedule row by row straight into a report (the schedule is never held in memory)
+def report_schedule(schedule_path: str, pdf_path: str, controller=None, title: str | None = None):
+    from controller import DuctController  # our duct controller
+    from schedule import normalise_row, read_schedule  # schedule rows -> inputs
+
+    controller = controller or DuctController()
+
+    def entries():
+        for number, row in enumerate(read_schedule(schedule_path), start=2):  # row 1 = header
+            try:
+                duct_id, inputs = normalise_row(row, number)
+            except ValueError as e:
+                yield f"Row {number}", {}, {"Error:": str(e)}
+                continue
+            yield duct_id, inputs, controller.duct_properties(**inputs)
+
+    return write_report(pdf_path, entries(), title or f"Duct Sizing Report - {schedule_path}")
+
+
+# Main guard
+# This runs only when report.py is executed directly
+if __name__ == "__main__":
+    import os  # paths
+    import sys  # command line
+    import tempfile  # benchmark output
+    import tracemalloc  # memory check
+    from controller import DuctController  # to solve the benchmark ducts
+
+    if len(sys.argv) > 1:
+        schedule_path = sys.argv[1]
+        pdf_path = sys.argv[2] if len(sys.argv) > 2 else os.path.splitext(schedule_path)[0] + "_report.pdf"
+        print(f"{pdf_path}: {report_schedule(schedule_path, pdf_path)}")
+        sys.exit()
+
+    # benchmark: solved ducts cycled into reports of growing size (solving isn't part of the timing)
+    controller = DuctController()
+    base = {"duct_type": "Rectangular", "roughness": 0.09, "temperature": 25, "relative_humidity": 50,
+            "elevation": 100, "noise_direction_factor": 1, "noise_distance": 2.1, "diameter": None}
+    solved = []
+    for i in range(500):
+        inputs = dict(base, flow_rate=100 + 7 * i, width=200 + 50 * (i % 12), height=150 + 50 * (i % 5))
+        solved.append((f"D-{i:05d}", inputs, controller.duct_properties(**inputs)))
+
+    def entries(count):
+        for i in range(count):
+            duct_id, inputs, results = solved[i % len(solved)]
+            yield f"D-{i:06d}", inputs, results
+
+    folder = tempfile.mkdtemp()
+    for count in (5_000, 50_000):
+        path = os.path.join(folder, f"report_{count}.pdf")
+        start = time.perf_counter()
+        summary = write_report(path, entries(count))
+        elapsed = time.perf_counter() - start
+
+        tracemalloc.start()
+        write_report(path, entries(count))
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{count} ducts -> {summary['pages']} pages in {elapsed:.2f} s "
+              f"({summary['pages'] / elapsed:.0f} pages/s, {count / elapsed:.0f} rows/s), "
+              f"{os.path.getsize(path) / 1e6:.1f} MB, peak memory {peak / 1e6:.2f} MB")
+    print(f"Reports in {folder}")
@@ -0,0 +1,194 @@
+# schedule.py
+# duct schedules -- tables of ducts exported from the BIM model (one row per duct, CSV or .xlsx)
+# turns raw rows into DuctController inputs and solved rows back into result columns
+
+import csv  # schedule files are plain CSV exports
+import itertools  # put the peeked first row back in front
+
+from controller import DuctController  # our duct controller
+from xlsx import XlsxReader, XlsxWriter  # streaming .xlsx schedules
+
+
+# default inputs for columns a schedule leaves out (same defaults as the UI fields)
+INPUT_DEFAULTS = {
+    "duct_type": "Rectangular",
+    "flow_rate": None,  # always required
+    "roughness": 0.09,  # sheet metal (mm)
+    "temperature": 25,  # °C
+    "relative_humidity": 50,  # %
+    "elevation": 100,  # m
+    "noise_direction_factor": 1,  # worst case: top corner of room
+    "noise_distance": 2.1,  # m
+    "width": None,
+    "height": None,
+    "diameter": None,
+}
+
+# converters for each input column -- matches the types the UI hands the controller
+INPUT_TYPES = {
+    "duct_type": str,
+    "flow_rate": int,
+    "roughness": float,
+    "temperature": float,
+    "relative_humidity": float,
+    "elevation": float,
+    "noise_direction_factor": int,
+    "noise_distance": float,
+    "width": int,
+    "height": int,
+    "diameter": int,
+}
+
+# header aliases seen in BIM exports -> our input names
+COLUMN_ALIASES = {
+    "id": "id", "tag": "id", "duct_id": "id", "duct_tag": "id", "mark": "id",
+    "type": "duct_type", "shape": "duct_type",
+    "flow": "flow_rate", "flow_rate_l/s": "flow_rate", "flow_(l/s)": "flow_rate",
+    "width_(mm)": "width", "height_(mm)": "height", "diameter_(mm)": "diameter",
+    "rh": "relative_humidity",
+}
+
+# numeric result columns written back to the schedule
+RESULT_COLUMNS = [
+    "Velocity (m/s)",
+    "Static Pressure Drop (Pa/m)",
+    "Total Pressure Drop (Pa/m)",
+    "Sound Pressure Level (dB)",
+    "Error",
+]
+
+
+# normalise a header cell: "Flow Rate" -> "flow_rate", "Width (mm)" -> "width_(mm)" -> "width"
+def normalise_column(name: str):
+    key = str(name).strip().lower().replace(" ", "_")
+    return COLUMN_ALIASES.get(key, key)
+
+
+# turn one raw schedule row (header -> cell text) into (duct id, controller inputs)
+# raises ValueError when a required input is missing or a cell won't convert
+def normalise_row(row: dict, row_number: int = 0):
+    cells = {}
+    for column, value in row.items():
+        if column is None:
+            continue  # csv puts overflow cells under a None key
+        if value is None or str(value).strip() == "":
+            continue  # blank cell -> use the default
+        cells[normalise_column(column)] = str(value).strip()
+
+    duct_id = cells.get("id") or f"Row {row_number}"  # fall back to the row number
+
+    inputs = dict(INPUT_DEFAULTS)
+    for name, convert in INPUT_TYPES.items():
+        if name in cells:
+            try:
+                # int("300.0") fails, so go through float for the int columns
+                inputs[name] = convert(float(cells[name])) if convert is int else convert(cells[name])
+            except ValueError:
+                raise ValueError(f"{duct_id}: invalid {name} '{cells[name]}'")
+
+    # duct type spelling from exports varies ("round", "RECT" etc.)
+    match (inputs["duct_type"].lower()):
+        case "rectangular" | "rect" | "rectangle":
+            inputs["duct_type"] = "Rectangular"
+        case "round" | "circular" | "circle":
+            inputs["duct_type"] = "Round"
+
+    # same checks as Duct.calculate_area/velocity, but up front with the duct id attached
+    if inputs["flow_rate"] is None:
+        raise ValueError(f"{duct_id}: flow rate must be provided!")
+    if inputs["duct_type"] == "Rectangular" and (inputs["width"] is None or inputs["height"] is None):
+        raise ValueError(f"{duct_id}: width and height must be provided for rectangular duct!")
+    if inputs["duct_type"] == "Round" and inputs["diameter"] is None:
+        raise ValueError(f"{duct_id}: diameter must be provided for round duct!")
+    return duct_id, inputs
+
+
+# solve one duct and return the numeric result columns
+# errors are reported in the Error column instead of stopping the whole schedule
+def solve_inputs(controller: DuctController, inputs: dict):
+    try:
+        duct = controller.create_duct(**inputs)
+        return {
+            "Velocity (m/s)": round(duct.calculate_velocity(), 3),
+            "Static Pressure Drop (Pa/m)": round(duct.calculate_static_pressure_drop(), 3),
+            "Total Pressure Drop (Pa/m)": round(duct.calculate_total_pressure_drop(), 3),
+            "Sound Pressure Level (dB)": round(duct.calculate_SPL(), 3),
+            "Error": "",
+        }
+    except (ValueError, TypeError, ZeroDivisionError) as e:  # bad dims / missing dims
+        return {column: "" for column in RESULT_COLUMNS[:-1]} | {"Error": str(e) or type(e).__name__}
+
+
+# stream raw rows from a schedule file (one dict per duct, keyed by the header row)
+# .xlsx workbooks are streamed too, the whole workbook is never loaded at once
+def read_schedule(path: str):
+    if path.lower().endswith(".xlsx"):
+        with XlsxReader(path) as reader:
+            yield from reader.dicts()
+        return
+    with open(path, "r", newline="", encoding="utf-8-sig") as f:  # -sig strips Excel's BOM
+        yield from csv.DictReader(f)
+
+
+# write rows (dicts) to a schedule file with the given column order
+# rows can be a generator -- each row is written as it's produced
+def write_schedule(path: str, columns: list, rows):
+    if path.lower().endswith(".xlsx"):
+        with XlsxWriter(path, "Results") as writer:
+            writer.write_row(columns)
+            for row in rows:
+                writer.write_row([row.get(column) for column in columns])
+        return
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=columns, extrasaction="ignore")
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+
+
+# solve a whole schedule file row by row and write it back out with the result columns appended
+# input and output are both streamed (CSV or .xlsx), so memory stays flat for any schedule length
+# returns the number of rows processed
+def solve_schedule(in_path: str, out_path: str, controller: DuctController | None = None):
+    controller = controller or DuctController()
+    rows = read_schedule(in_path)
+    first = next(rows, None)
+    if first is None:
+        write_schedule(out_path, RESULT_COLUMNS, [])
+        return 0
+    columns = [column for column in first if column is not None] + RESULT_COLUMNS
+    count = 0
+
+    # generator so write_schedule pulls one solved row at a time
+    def solved_rows():
+        nonlocal count
+        for number, row in enumerate(itertools.chain([first], rows), start=2):  # row 1 = header
+            try:
+                _, inputs = normalise_row(row, number)
+                results = solve_inputs(controller, inputs)
+            except ValueError as e:
+                results = {"Error": str(e)}
+            count += 1
+            yield row | results
+
+    write_schedule(out_path, columns, solved_rows())
+    return count
+
+
+# Main guard
+# This runs only when schedule.py is executed directly
+if __name__ == "__main__":
+    controller = DuctController()
+
+    # a couple of rows the way a BIM export hands them over
+    rows = [
+        {"Tag": "SA-01", "Type": "rect", "Flow Rate": "300", "Width (mm)": "400", "Height (mm)": "200"},
+        {"Tag": "SA-02", "Type": "Round", "Flow Rate": "1000", "Diameter (mm)": "250"},
+        {"Tag": "SA-03", "Type": "Round", "Flow Rate": "500"},  # missing diameter
+    ]
+    for number, row in enumerate(rows, start=2):  # row 1 = header
+        try:
+            duct_id, inputs = normalise_row(row, number)
+            print(duct_id, solve_inputs(controller, inputs))
+        except ValueError as e:
+            print(f"Error: {e}")
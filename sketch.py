@@ -0,0 +1,62 @@
+# sketch.py
+# geometry for the isometric duct sketch -- shared by the UI canvas and the PDF report
+# only works out the lines (canvas style coordinates, y down), whoever draws them picks the backend
+
+# line colours for each direction
+LINE_COLOUR_HOR = "lime"  # horizontal edges
+LINE_COLOUR_VER = "blue"  # vertical edges
+LINE_COLOUR_ISO = "red"  # depth (isometric) edges
+
+
+# isometric box centred on (centre_x, centre_y) -> [(start, end, colour), ...]
+def isometric_duct(centre_x: float, centre_y: float, box_width: float = 100, box_height: float = 60,
+                   box_depth: float = 100):
+    # isometric offsets
+    iso_x_depth = box_depth * 0.6  # horizontal depth
+    iso_y_depth = box_depth * 0.45  # vertical depth
+
+    # duct corner points
+    front_y_adjust = -iso_y_depth / 3  # this shifts the entire object to sit better relative to centre
+
+    # front top left
+    point_front_top_left = (centre_x - box_width/2, centre_y - box_height/2 + front_y_adjust)
+    # front top right
+    point_front_top_right = (centre_x + box_width/2, centre_y - box_height/2 + front_y_adjust)
+    # front bottom right
+    point_front_bottom_right = (centre_x + box_width/2, centre_y + box_height/2 + front_y_adjust)
+    # front bottom left
+    point_front_bottom_left = (centre_x - box_width/2, centre_y + box_height/2 + front_y_adjust)
+
+    # back top left
+    point_back_top_left = (point_front_top_left[0] + iso_x_depth, point_front_top_left[1] + iso_y_depth)
+    # back top right
+    point_back_top_right = (point_front_top_right[0] + iso_x_depth, point_front_top_right[1] + iso_y_depth)
+    # back bottom right
+    point_back_bottom_right = (point_front_bottom_right[0] + iso_x_depth, point_front_bottom_right[1] + iso_y_depth)
+    # back bottom left
+    point_back_bottom_left = (point_front_bottom_left[0] + iso_x_depth, point_front_bottom_left[1] + iso_y_depth)
+
+    return [
+        # front face (clockwise from top left)
+        (point_front_top_left, point_front_top_right, LINE_COLOUR_HOR),
+        (point_front_top_right, point_front_bottom_right, LINE_COLOUR_VER),
+        (point_front_bottom_right, point_front_bottom_left, LINE_COLOUR_HOR),
+        (point_front_bottom_left, point_front_top_left, LINE_COLOUR_VER),
+        # back face (clockwise from top left)
+        (point_back_top_left, point_back_top_right, LINE_COLOUR_HOR),
+        (point_back_top_right, point_back_bottom_right, LINE_COLOUR_VER),
+        (point_back_bottom_right, point_back_bottom_left, LINE_COLOUR_HOR),
+        (point_back_bottom_left, point_back_top_left, LINE_COLOUR_VER),
+        # connecting depth lines (front to back corners)
+        (point_front_top_left, point_back_top_left, LINE_COLOUR_ISO),
+        (point_front_top_right, point_back_top_right, LINE_COLOUR_ISO),
+        (point_front_bottom_right, point_back_bottom_right, LINE_COLOUR_ISO),
+        (point_front_bottom_left, point_back_bottom_left, LINE_COLOUR_ISO),
+    ]
+
+
+# Main guard
+# This runs only when sketch.py is executed directly
+if __name__ == "__main__":
+    for start, end, colour in isometric_duct(250, 125):
+        print(f"{colour:>5}: ({start[0]:.1f}, {start[1]:.1f}) -> ({end[0]:.1f}, {end[1]:.1f})")
@@ -0,0 +1,175 @@
+# thermal.py
+# heat gain / loss along long duct runs
+# Duct assumes one fixed temperature for the whole run -- on long mains through hot plant rooms
+# or roof spaces the air warms (or cools) along the length, and density, viscosity and Pa/m move with it
+#
+# each run is marched in sub-segments:
+#   heat:      T_out = T_surr + (T_in - T_surr) * exp(-U.P.dx / (m.cp))   (exact for a step, decay is fixed per run)
+#   density:   moisture and pressure don't change along the duct, so p ~ 1/T  -> p2 = p1 * T1/T2
+#   viscosity: Sutherland's law as a ratio                                     -> u2 = u1 * ratio(T1, T2)
+#   velocity:  mass flow is constant, so V = m / (p.A) and Re = m.Dh / (A.u)
+# the properties are stepped from the previous sub-segment, never recomputed from scratch
+# the whole network is marched together, one tree level at a time, with every run on a level in the same lists
+
+import math  # for maths like exp etc
+
+from duct_batch import air_density, dynamic_viscosity, friction_factor, section  # batched duct chain
+
+SPECIFIC_HEAT = 1006  # cp of air (J/kg.K)
+
+
+# Sutherland viscosity ratio u(T2)/u(T1) -- same law/constants as Duct.calculate_dynamic_viscosity
+def viscosity_ratio(T1: float, T2: float):
+    R1 = T1 * 9 / 5 + 491.67  # °C to °R
+    R2 = T2 * 9 / 5 + 491.67
+    return (0.555 * R1 + 120) / (0.555 * R2 + 120) * (R2 / R1)**1.5
+
+
+# this is our duct thermal model class
+class DuctThermalModel:
+    def __init__(self,
+                 network,
+                 supply_temperature: float,  # air leaving the fan/AHU (°C)
+                 supply_relative_humidity: float | None = None,  # % at the supply temperature
+                 surrounding_temperature: float = 25,  # default air around the ducts (°C)
+                 u_value: float = 1.0,  # default U-value of duct + insulation (W/m².K)
+                 steps: int = 20,  # sub-segments per run
+                 ):
+        self.network = network  # DuctNetwork
+        self.supply_temperature = supply_temperature
+        self.supply_relative_humidity = (network.relative_humidity if supply_relative_humidity is None
+                                         else supply_relative_humidity)
+        self.surrounding_temperature = surrounding_temperature
+        self.u_value = u_value
+        self.steps = steps
+
+    # march every run in the network -> per segment results + network totals
+    def run(self):
+        network = self.network
+        segments = list(network.segments.values())
+        parents = network.parent_indices()
+
+        # supply air state at the fan -- the only full property calculation
+        supply_density = air_density(self.supply_temperature, self.supply_relative_humidity, network.elevation)
+        supply_viscosity = dynamic_viscosity(self.supply_temperature)
+
+        # group runs by tree level -- every run on a level can be marched side by side
+        depth = []
+        for i in range(len(segments)):
+            depth.append(0 if parents[i] < 0 else depth[parents[i]] + 1)
+        levels = {}
+        for i, d in enumerate(depth):
+            levels.setdefault(d, []).append(i)
+
+        # outlet state of each run (T °C, density, viscosity), filled in level by level
+        outlet = [None] * len(segments)
+        results = {}
+
+        for d in sorted(levels):
+            idx = levels[d]
+
+            # per run constants
+            sections = [section(segments[i].duct_type, segments[i].width, segments[i].height, segments[i].diameter)
+                        for i in idx]
+            A = [a for a, _ in sections]
+            Dh = [h for _, h in sections]
+            m = [supply_density * segments[i].flow_rate * 1e-3 for i in idx]  # mass flow (kg/s), flows at supply
+            dx = [segments[i].length / self.steps for i in idx]
+            rr = [segments[i].roughness / 1000 / h for i, h in zip(idx, Dh)]
+            T_surr = [self._surrounding(segments[i]) for i in idx]
+            # fixed per-step decay of the temperature difference (perimeter = 4A/Dh)
+            decay = [math.exp(-self._u_value(segments[i]) * 4 * a / h * step / (mass * SPECIFIC_HEAT))
+                     for i, a, h, step, mass in zip(idx, A, Dh, dx, m)]
+
+            # inlet state: the fan for level 0, the parent's outlet otherwise
+            T, rho, mu = [], [], []
+            for i in idx:
+                if parents[i] < 0:
+                    state = (self.supply_temperature, supply_density, supply_viscosity)
+                else:
+                    state = outlet[parents[i]]
+                T.append(state[0])
+                rho.append(state[1])
+                mu.append(state[2])
+            T_in = list(T)
+
+            # Pa/m at the inlet, then trapezoid sums over each step
+            Ps = self._static(m, A, Dh, rr, rho, mu)
+            drop = [0.0] * len(idx)
+
+            for _ in range(self.steps):
+                T_new = [ts + (t - ts) * k for t, ts, k in zip(T, T_surr, decay)]
+                # incremental property updates from the previous step's state
+                rho = [p * (t + 273.15) / (tn + 273.15) for p, t, tn in zip(rho, T, T_new)]
+                mu = [u * viscosity_ratio(t, tn) for u, t, tn in zip(mu, T, T_new)]
+                Ps_new = self._static(m, A, Dh, rr, rho, mu)
+                drop = [total + (a + b) / 2 * step for total, a, b, step in zip(drop, Ps, Ps_new, dx)]
+                T, Ps = T_new, Ps_new
+
+            for n, i in enumerate(idx):
+                outlet[i] = (T[n], rho[n], mu[n])
+                results[segments[i].segment_id] = {
+                    "inlet_temperature": T_in[n],  # °C
+                    "outlet_temperature": T[n],  # °C
+                    "heat_gain": m[n] * SPECIFIC_HEAT * (T[n] - T_in[n]),  # W (negative = loss)
+                    "pressure_drop": drop[n],  # static Pa over the run
+                    "average_pressure_drop": drop[n] / segments[i].length if segments[i].length else 0.0,  # Pa/m
+                    "outlet_velocity": m[n] / (rho[n] * A[n]),  # m/s
+                }
+
+        terminals = network.terminals()
+        return {
+            "segments": results,
+            "total_heat_gain": sum(r["heat_gain"] for r in results.values()),  # W
+            "terminal_temperatures": {sid: results[sid]["outlet_temperature"] for sid in terminals},
+        }
+
+    # static pressure drop (Pa/m) for every run on a level -- Re only moves with viscosity (m.Dh / A.u)
+    @staticmethod
+    def _static(m, A, Dh, rr, rho, mu):
+        Ps = []
+        for mass, a, h, r, p, u in zip(m, A, Dh, rr, rho, mu):
+            V = mass / (p * a)
+            f = friction_factor(mass * h / (a * u), r)
+            Ps.append(f / h * p * V**2 / 2)
+        return Ps
+
+    def _surrounding(self, segment):
+        return self.surrounding_temperature if segment.surrounding_temperature is None else segment.surrounding_temperature
+
+    def _u_value(self, segment):
+        return self.u_value if segment.u_value is None else segment.u_value
+
+
+# Main guard
+# This runs only when thermal.py is executed directly
+if __name__ == "__main__":
+    import time  # timing
+    from duct import Duct  # single duct reference
+    from network import DuctNetwork, DuctSegment  # demo networks
+
+    # one 80 m supply main at 14°C through a 40°C roof space, uninsulated vs insulated
+    for u_value in (5.0, 0.8):
+        network = DuctNetwork()
+        network.add(DuctSegment("MAIN", "Rectangular", 1500, width=800, height=400, length=80,
+                                u_value=u_value, surrounding_temperature=40))
+        main = DuctThermalModel(network, supply_temperature=14).run()["segments"]["MAIN"]
+        fixed = Duct("Rectangular", 1500, 0.09, 14, 50, 100, 1, 2.1, 800, 400).calculate_static_pressure_drop() * 80
+        print(f"U={u_value}: {main['inlet_temperature']:.1f} -> {main['outlet_temperature']:.2f} °C, "
+              f"heat gain {main['heat_gain']:.0f} W, {main['pressure_drop']:.2f} Pa (fixed 14°C: {fixed:.2f} Pa)")
+
+    # whole building: 20 floors x 50 branches
+    network = DuctNetwork()
+    network.add(DuctSegment("RISER", "Rectangular", 20_000, width=2000, height=1000, length=60,
+                            surrounding_temperature=30))
+    for floor in range(20):
+        network.add(DuctSegment(f"F{floor}", "Rectangular", 1000, width=800, height=400, length=40,
+                                parent="RISER", surrounding_temperature=35 if floor == 19 else 24))
+        for branch in range(50):
+            network.add(DuctSegment(f"F{floor}-B{branch}", "Round", 20, diameter=160, length=3 + branch % 7,
+                                    parent=f"F{floor}"))
+    start = time.perf_counter()
+    results = DuctThermalModel(network, supply_temperature=14, u_value=1.2).run()
+    warmest = max(results["terminal_temperatures"].items(), key=lambda item: item[1])
+    print(f"{len(network)} runs x 20 steps in {time.perf_counter() - start:.3f} s, "
+          f"total heat gain {results['total_heat_gain'] / 1000:.1f} kW, warmest terminal {warmest[0]} {warmest[1]:.2f} °C")
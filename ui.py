@@ -26,6 +26,24 @@ from tkinter import Text, DISABLED, END
 # CONTROLLER IMPORT (getting model data to viewer via controller, MVC)
 from controller import DuctController  # our controller
 
+# JOBS IMPORT (long calculations run off the Tk thread)
+from jobs import JobRunner  # background worker + queue polled with after()
+
+# PROJECT IMPORT (ducts + cached results persisted between sessions)
+from project import Project  # snapshot + append-only journal project file
+
+# CHART IMPORTS (friction chart view on the top canvas)
+from friction_chart import FrictionChart  # chart geometry + cached curve layers
+from duct_batch import air_density, dynamic_viscosity, evaluate, section  # quick single point for the marker
+
+# SKETCH IMPORT (isometric duct geometry, also used by the PDF report)
+from sketch import isometric_duct
+
+# REPORT IMPORTS (PDF printout of the current duct / open project)
+from tkinter import filedialog  # save as dialog
+from report import write_report  # streaming PDF report writer
+import os  # remove a report that didn't finish
+
 
 # CORE - tkinter geometry managers:
 # pack() - Packs widgets in blocks before placing them in the parent widget
@@ -35,7 +53,7 @@ from controller import DuctController  # our controller
 
 # this is our GUI class
 class UI:
-    def __init__ (self, width, height, bg="black"):
+    def __init__ (self, width, height, bg="black", project_path=None):
         self.__root = Tk()  # our widget data member
         self.__root.title("Engineering Solver")  # UI title
         self.__root.protocol( "WM_DELETE_WINDOW", self.close)  # X button linked to close method
@@ -49,8 +67,26 @@ class UI:
         # call draw duct method
         self._draw_static_duct()  # this draws a duct in the window
 
+        # friction chart view (hidden until the Chart button is clicked)
+        self._view = "duct"  # "duct" sketch or friction "chart"
+        self._chart = FrictionChart(self._canvas_width, self._canvas_height)  # caches its curve layers
+        self._chart_drawn = False  # are the cached curve layers on the canvas?
+        self._chart_marker = None  # canvas item id of the operating point marker
+
+        # last solved duct (tag, inputs, results) -- what the PDF button prints when no project is open
+        self._last_duct = None
+
         self.__running = False  # UI window running flag
 
+        # background job runner -- calculations run on a worker thread, results come back via after()
+        self.jobs = JobRunner(self.__root)
+        self._current_job = None  # the calculation job currently running (if any)
+        self._result_callback = None  # extra on_result hook for the current job
+        self._exporting = False  # the current job is a report export (a calculation won't replace it)
+
+        # optional project file -- every calculation is journaled against the duct tag
+        self.project = Project(project_path) if project_path is not None else None
+
         # Create Controller instance to link model files to viewer
         self.controller = DuctController()  # "passes" info to "ui"
 
@@ -64,6 +100,11 @@ class UI:
         # once init is done, call toggle duct type fields
         self.toggle_duct_type_fields()
 
+        # any input change moves the friction chart marker (and rebuilds curves if the conditions changed)
+        for var in (self.duct_type_var, self.width_var, self.height_var, self.flow_rate_var,
+                    self.roughness_var, self.temperature_var, self.amb_rh_var, self.elevation_var):
+            var.trace_add("write", self.update_friction_chart)
+
     # WINDOW METHODS
     # need a method to update the visuals
     def redraw(self):
@@ -79,6 +120,9 @@ class UI:
     # finally, a method to close it all down when flag is set false
     # add an X button in init to link to this method
     def close(self):  
+        self.jobs.cancel_all()  # don't leave workers chewing on results nobody will see
+        if self.project is not None:
+            self.project.close()  # release the journal (compacts if it has grown long)
         self.__running = False
 
     # INPUT METHODS
@@ -184,6 +228,14 @@ class UI:
                             input_frame, "Noise Distance", "white", 5,
                             unit="(m)", default=2.1))  # default to 2.1m
 
+        # DUCT TAG (project key for this duct)
+        (self.tag_label,
+        self.tag_var,
+        self.tag_entry,
+        self.tag_unit) = (self.input_entry_helper(
+                            input_frame, "Duct Tag", "white", 5, 3,   # same row as noise distance
+                            unit="", default="D-001"))  # default tag
+
         # BUTTONS -- input by clicking
         # CALCULATE
         # Create the Calculate/Run button
@@ -197,6 +249,43 @@ class UI:
         # grid -- apply button to our field gird position
         self.calculate_button.grid(row=6, column=0, columnspan=2, pady=0, sticky="w")
 
+        # CANCEL
+        # Create the Cancel button to stop a running calculation job
+        self.cancel_button = Button(input_frame,  # our button's frame
+                                  text="Cancel",  # text in button
+                                  command=self.cancel_calculation,  # this cancels the running job
+                                  padx=0,  # button x & y padding
+                                  pady=0,
+                                  font=("Arial", 8),
+                                  state=DISABLED  # nothing to cancel yet
+                                  )
+        # grid -- next to the calculate button
+        self.cancel_button.grid(row=6, column=2, columnspan=2, pady=0, sticky="w")
+
+        # CHART / DUCT VIEW
+        # Create the button that flips the top canvas between the duct sketch and the friction chart
+        self.view_button = Button(input_frame,  # our button's frame
+                                  text="Chart",  # text in button
+                                  command=self.toggle_view,  # this flips the view
+                                  padx=0,  # button x & y padding
+                                  pady=0,
+                                  font=("Arial", 8)
+                                  )
+        # grid -- next to the cancel button
+        self.view_button.grid(row=6, column=4, columnspan=2, pady=0, sticky="w")
+
+        # PDF REPORT
+        # Create the button that prints the sketch + results to a PDF
+        self.report_button = Button(input_frame,  # our button's frame
+                                  text="PDF",  # text in button
+                                  command=self.export_report,  # this writes the report
+                                  padx=0,  # button x & y padding
+                                  pady=0,
+                                  font=("Arial", 8)
+                                  )
+        # grid -- next to the chart button
+        self.report_button.grid(row=6, column=6, columnspan=2, pady=0, sticky="w")
+
     # HELPER method to reduce DRY code (less repetitive...)
     # basically makes the label, grid, var & unit, grid = one fell swoop!
     # input row = X, column = default 0, and every entry thereafter just adds 1!
@@ -282,14 +371,32 @@ class UI:
             # now that we've validated the correct duct types, let's process the results
             # call the controller to provide us with the calculated results (from duct.py)
             # match the order of duct_properties()
-            results = self.controller.duct_properties(
-                duct_type, flow_rate, roughness, temperature, 
-                relative_humidity, elevation, noise_direction_factor, 
-                noise_distance, width, height, diameter
+            inputs = {"duct_type": duct_type, "flow_rate": flow_rate, "roughness": roughness,
+                      "temperature": temperature, "relative_humidity": relative_humidity,
+                      "elevation": elevation, "noise_direction_factor": noise_direction_factor,
+                      "noise_distance": noise_distance, "width": width, "height": height,
+                      "diameter": diameter}
+            tag = self.tag_var.get().strip()  # project key
+
+            # already solved these exact inputs in the project? reuse, no recompute
+            if self.project is not None and tag:
+                cached = self.project.cached_results(tag, inputs)
+                if cached is not None:
+                    if self._report_running():
+                        return
+                    # an older calculation still running would land on top of these later -- stop it
+                    if self._current_job is not None:
+                        self._current_job.cancel()
+                        self._finish_job()
+                    self._last_duct = (tag, inputs, cached)
+                    self.display_results(cached)
+                    return
+
+            # NOTE: the calc runs on a worker thread, display_results is called back on the Tk thread
+            self.submit_calculation(
+                lambda job: self.controller.duct_properties(**inputs),
+                on_result=lambda results: self._store_results(tag, inputs, results)
             )
-            
-            # now that we have the inputs & calculations successfully, let's display the results!
-            self.display_results(results)
 
         except ValueError:
             # need an error to print if we cannot reach the input fields
@@ -298,6 +405,208 @@ class UI:
             self.display_results(error_message)
 
     
+    # JOB METHODS
+    # hand a calculation to the background job runner
+    # func(job) runs on a worker thread -- it may call job.report_progress() and job.check_cancelled()
+    # the results dict is handed to display_results on the Tk thread once it's done
+    # on_result (optional) is also called with the results dict, after they've been displayed
+    # export=True marks a report export -- it can only be stopped with the cancel button
+    def submit_calculation(self, func, on_result=None, export: bool = False):
+        # only one job at a time, a new click replaces the old one (unless a report is being written)
+        if self._report_running():
+            return None
+        if self._current_job is not None:
+            self._current_job.cancel()
+
+        self.display_results({"Status": "Calculating..."})
+        self.cancel_button.config(state="normal")  # allow cancelling while it runs
+        self._result_callback = on_result
+        self._exporting = export
+        # each callback is tied to its own job so a replaced job reporting late can be ignored
+        # (job is looked up when the callback runs -- always a later Tk poll, after it's been assigned)
+        job = self._current_job = self.jobs.submit(
+            func,
+            on_result=lambda results: self._on_job_result(job, results),
+            on_progress=lambda done, total, message: self._on_job_progress(job, done, total, message),
+            on_error=lambda error: self._on_job_error(job, error),
+            on_cancel=lambda: self._on_job_cancelled(job),
+        )
+        return job
+
+    # called when clicking the cancel button
+    def cancel_calculation(self):
+        if self._current_job is not None:
+            self._current_job.cancel()
+
+    # job callbacks -- these all run on the Tk thread, so touching widgets is safe
+    # anything from a job that's since been replaced is dropped, it must not clear or overwrite the new one
+    def _on_job_result(self, job, results):
+        if job is not self._current_job:
+            return
+        callback = self._result_callback
+        self._finish_job()
+        self.display_results(results)
+        if callback is not None:
+            callback(results)
+
+    def _on_job_progress(self, job, done, total, message):
+        if job is not self._current_job:
+            return
+        percent = 100 * done / total if total else 0
+        self.display_results({"Status": f"{message} {done}/{total} ({percent:.0f}%)"})
+
+    def _on_job_error(self, job, error):
+        if job is not self._current_job:
+            return
+        self._finish_job()
+        self.display_results({"Error": str(error)})
+
+    def _on_job_cancelled(self, job):
+        if job is not self._current_job:
+            return  # the replaced job stopping, the new one is still running
+        cancelled = "Report cancelled, nothing was saved" if self._exporting else "Calculation cancelled"
+        self._finish_job()
+        self.display_results({"Status": cancelled})
+
+    # reset the job state once the current job has reported back
+    def _finish_job(self):
+        self._current_job = None
+        self._result_callback = None
+        self._exporting = False
+        self.cancel_button.config(state=DISABLED)
+
+    # is a report being written? -- say so rather than cancel it, only the cancel button stops an export
+    def _report_running(self):
+        if self._current_job is not None and self._exporting:
+            self.display_results({"Error": "A report is still being written, wait for it or cancel it first!"})
+            return True
+        return False
+
+    # PROJECT METHODS
+    # journal a solved duct into the open project (errors aren't worth keeping)
+    def _store_results(self, tag, inputs, results):
+        self._last_duct = (tag, inputs, results)
+        if self.project is None or not tag or "Error:" in results:
+            return
+        self.project.put(tag, inputs, results)
+
+    # REPORT METHODS
+    # PDF printout -- every duct in the open project, or the last calculated duct without one
+    # written on a worker thread (big projects), ducts without cached results are solved on the way
+    def export_report(self):
+        if self.project is not None and self.project.ducts:
+            # snapshot on the Tk thread -- the project isn't touched from the worker
+            ducts = [(duct_id, duct["inputs"], duct["results"]) for duct_id, duct in self.project.ducts.items()]
+            title = f"Duct Sizing Report - {self.project.path}"
+        elif self._last_duct is not None:
+            ducts = [self._last_duct]
+            title = "Duct Sizing Report"
+        else:
+            self.display_results({"Error": "Nothing to report, calculate a duct first!"})
+            return
+
+        if self._report_running():
+            return  # check before asking for a path, not after
+        path = filedialog.asksaveasfilename(defaultextension=".pdf", filetypes=[("PDF", "*.pdf")])
+        if not path:
+            return  # dialog cancelled
+
+        def write(job):
+            def entries():
+                for duct_id, inputs, results in ducts:
+                    job.check_cancelled()
+                    yield duct_id, inputs, results or self.controller.duct_properties(**inputs)
+
+            try:
+                summary = write_report(path, entries(), title, total=len(ducts),
+                                       progress=lambda done, total: job.report_progress(done, total, "Writing report"))
+            except Exception:  # cancelled (JobCancelled) or failed -- a short PDF would pass for a full one
+                if os.path.exists(path):
+                    os.remove(path)
+                raise
+            return {"Report": path, "Ducts": summary["ducts"], "Pages": summary["pages"]}
+
+        self.submit_calculation(write, export=True)
+
+    # CHART METHODS
+    # flip the top canvas between the duct sketch and the friction chart
+    # both stay on the canvas, we just hide the one that isn't showing
+    def toggle_view(self):
+        if self._view == "duct":
+            self._view = "chart"
+            self.__canvas.itemconfigure("duct_drawing", state="hidden")
+            self.__canvas.itemconfigure("chart", state="normal")
+            self.view_button.config(text="Duct")
+            self.update_friction_chart()
+        else:
+            self._view = "duct"
+            self.__canvas.itemconfigure("chart", state="hidden")
+            self.__canvas.itemconfigure("duct_drawing", state="normal")
+            self.view_button.config(text="Chart")
+
+    # called on every input change (trace) -- cheap unless the ambient conditions changed
+    def update_friction_chart(self, *args):
+        if self._view != "chart":
+            return  # nothing to update while the duct sketch is showing
+        try:
+            conditions = (float(self.roughness_var.get()), float(self.temperature_var.get()),
+                          float(self.amb_rh_var.get()), float(self.elevation_var.get()))
+        except ValueError:
+            return  # half typed value, keep what's drawn
+
+        # curve layers are cached -- only redrawn when roughness/temp/RH/elevation change
+        layers, rebuilt = self._chart.layers(*conditions)
+        if rebuilt or not self._chart_drawn:
+            self._draw_chart_layers(layers)
+
+        self._move_chart_marker(conditions)
+
+    # redraw the cached curve layers (frame, gridlines, size + velocity lines)
+    def _draw_chart_layers(self, layers):
+        self.__canvas.delete("chart_curves")
+        tags = ("chart", "chart_curves")
+        grid_lines, labels = layers["axes"]
+        for coords in grid_lines:
+            self.__canvas.create_line(*coords, fill="grey25", tags=tags)
+        for x, y, text in labels:
+            self.__canvas.create_text(x, y, text=text, fill="grey60", font=("Arial", 7), tags=tags)
+        for text, coords in layers["size_lines"]:
+            self.__canvas.create_line(*coords, fill="lime", tags=tags)
+            self.__canvas.create_text(coords[-2] - 4, coords[-1] - 6, text=text, fill="lime",
+                                      font=("Arial", 7), anchor="e", tags=tags)
+        for text, coords in layers["velocity_lines"]:
+            self.__canvas.create_line(*coords, fill="deep sky blue", dash=(3, 3), tags=tags)
+            self.__canvas.create_text(coords[0], coords[1] + 6, text=text, fill="deep sky blue",
+                                      font=("Arial", 7), anchor="w", tags=tags)
+        self._chart_drawn = True
+        if self._chart_marker is not None:
+            self.__canvas.tag_raise(self._chart_marker)  # keep the marker on top of new curves
+
+    # move the single marker item to the current duct's (flow, Pa/m) -- no other canvas items touched
+    def _move_chart_marker(self, conditions):
+        roughness, temperature, relative_humidity, elevation = conditions
+        try:
+            flow = float(self.flow_rate_var.get())
+            if self.duct_type_var.get() == "Round":
+                area, Dh = section("Round", diameter=float(self.width_var.get()))
+            else:
+                area, Dh = section("Rectangular", float(self.width_var.get()), float(self.height_var.get()))
+            result = evaluate(area, Dh, flow, roughness, air_density(temperature, relative_humidity, elevation),
+                              dynamic_viscosity(temperature))
+            x, y = self._chart.marker(flow, result["static_pressure_drop"][0])
+        except (ValueError, ZeroDivisionError):
+            if self._chart_marker is not None:
+                self.__canvas.itemconfigure(self._chart_marker, state="hidden")  # invalid input, hide it
+            return
+
+        radius = 4
+        if self._chart_marker is None:
+            self._chart_marker = self.__canvas.create_oval(x - radius, y - radius, x + radius, y + radius,
+                                                           fill="red", outline="white", tags=("chart",))
+        else:
+            self.__canvas.coords(self._chart_marker, x - radius, y - radius, x + radius, y + radius)
+            self.__canvas.itemconfigure(self._chart_marker, state="normal")
+
     # make a new Text widget below fields for "terminal" output simulation
     def create_terminal_output(self):
         # Create a terminal-like text area
@@ -332,59 +641,10 @@ class UI:
         centre_x = self._canvas_width / 2  # set to canvas half size
         centre_y = self._canvas_height / 2  # set to canvas half size
 
-        # set duct box dimensions
-        box_width = 100
-        box_height = 60
-        box_depth = 100
-
-        # isometric offsets
-        iso_x_depth = box_depth * 0.6  # horizontal depth
-        iso_y_depth = box_depth * 0.45  # vertical depth
-
-        # duct corner points
-        front_y_adjust = -iso_y_depth / 3  # this shifts the entire object to sit better relative to centre
-
-        # front top left
-        point_front_top_left = (centre_x - box_width/2, centre_y - box_height/2 + front_y_adjust)
-        # front top right
-        point_front_top_right = (centre_x + box_width/2, centre_y - box_height/2 + front_y_adjust)
-        # front bottom right
-        point_front_bottom_right = (centre_x + box_width/2, centre_y + box_height/2 + front_y_adjust)
-        # front bottom left
-        point_front_bottom_left = (centre_x - box_width/2, centre_y + box_height/2 + front_y_adjust)
-
-        # back top left
-        point_back_top_left = (point_front_top_left[0] + iso_x_depth, point_front_top_left[1] + iso_y_depth)
-        # bottom top right
-        point_back_top_right = (point_front_top_right[0] + iso_x_depth, point_front_top_right[1] + iso_y_depth)
-        # bottom bottom right
-        point_back_bottom_right = (point_front_bottom_right[0] + iso_x_depth, point_front_bottom_right[1] + iso_y_depth)
-        # bottom bottom left
-        point_back_bottom_left = (point_front_bottom_left[0] + iso_x_depth, point_front_bottom_left[1] + iso_y_depth)
-
-        # draw the lines
-        line_colour_hor = "lime"
-        line_colour_ver = "blue"
-        line_colour_iso = "red"
+        # isometric box lines (shared with the PDF report)
         line_width = 3
-
-        # draw front face (drawing clockwise from top left)
-        self.__canvas.create_line(point_front_top_left, point_front_top_right, fill=line_colour_hor, width=line_width, tags="duct_drawing")
-        self.__canvas.create_line(point_front_top_right, point_front_bottom_right, fill=line_colour_ver, width=line_width, tags="duct_drawing")
-        self.__canvas.create_line(point_front_bottom_right, point_front_bottom_left, fill=line_colour_hor, width=line_width, tags="duct_drawing")
-        self.__canvas.create_line(point_front_bottom_left, point_front_top_left, fill=line_colour_ver, width=line_width, tags="duct_drawing")
-
-        # draw back face (drawing clockwise from top left)
-        self.__canvas.create_line(point_back_top_left, point_back_top_right, fill=line_colour_hor, width=line_width, tags="duct_drawing")
-        self.__canvas.create_line(point_back_top_right, point_back_bottom_right, fill=line_colour_ver, width=line_width, tags="duct_drawing")
-        self.__canvas.create_line(point_back_bottom_right, point_back_bottom_left, fill=line_colour_hor, width=line_width, tags="duct_drawing")
-        self.__canvas.create_line(point_back_bottom_left, point_back_top_left, fill=line_colour_ver, width=line_width, tags="duct_drawing")
-
-        # draw connecting depth lines (front to back corners)
-        self.__canvas.create_line(point_front_top_left, point_back_top_left, fill=line_colour_iso, width=line_width, tags="duct_drawing")
-        self.__canvas.create_line(point_front_top_right, point_back_top_right, fill=line_colour_iso, width=line_width, tags="duct_drawing")
-        self.__canvas.create_line(point_front_bottom_right, point_back_bottom_right, fill=line_colour_iso, width=line_width, tags="duct_drawing")
-        self.__canvas.create_line(point_front_bottom_left, point_back_bottom_left, fill=line_colour_iso, width=line_width, tags="duct_drawing")
+        for start, end, colour in isometric_duct(centre_x, centre_y):
+            self.__canvas.create_line(start, end, fill=colour, width=line_width, tags="duct_drawing")
 
 
 # Main guard
@@ -0,0 +1,268 @@
+# uncertainty.py
+# Monte Carlo uncertainty analysis over duct inputs
+# site conditions never match design -- roughness drifts, flows measure ±10%, installed sizes deviate
+# each input gets a distribution, samples are pushed through the batched duct chain
+# and we report percentiles of velocity, total pressure drop and sound pressure level
+#
+# reproducible: every chunk of samples has its own seeded random stream keyed on (seed, duct, chunk)
+# so results are identical however many CPU cores the chunks are spread over
+
+import math  # for maths like pi etc
+import os  # cpu count
+import random  # seeded substreams
+from array import array  # compact sample buffers to hand back from worker processes
+from concurrent.futures import ProcessPoolExecutor  # spread chunks across cores
+
+from duct_batch import air_properties, broadcast, evaluate, section  # batched duct chain
+from schedule import INPUT_DEFAULTS  # defaults for inputs left out
+from simulation import percentile  # percentile of a sorted list
+
+
+# DISTRIBUTIONS
+# every distribution has sample(rng, n) -> list of n values
+
+# a fixed value (no uncertainty)
+class Fixed:
+    def __init__(self, value):
+        self.value = value
+
+    def sample(self, rng, n):
+        return self.value  # single value, broadcast by the batch chain
+
+    def __repr__(self):
+        return f"Fixed({self.value})"
+
+
+# normal distribution, e.g. measured flow rate
+class Normal:
+    def __init__(self, mean: float, sd: float):
+        self.mean = mean
+        self.sd = sd
+
+    # e.g. Normal.relative(300, 0.05) -> 300 L/s with a 5% standard deviation
+    @classmethod
+    def relative(cls, mean: float, fraction: float):
+        return cls(mean, abs(mean) * fraction)
+
+    def sample(self, rng, n):
+        gauss = rng.gauss
+        return [gauss(self.mean, self.sd) for _ in range(n)]
+
+    def __repr__(self):
+        return f"Normal({self.mean}, {self.sd})"
+
+
+# uniform distribution between two limits, e.g. roughness drift
+class Uniform:
+    def __init__(self, low: float, high: float):
+        self.low = low
+        self.high = high
+
+    # e.g. Uniform.plus_minus(300, 0.10) -> 270 to 330
+    @classmethod
+    def plus_minus(cls, value: float, fraction: float):
+        return cls(value * (1 - fraction), value * (1 + fraction))
+
+    def sample(self, rng, n):
+        uniform = rng.uniform
+        return [uniform(self.low, self.high) for _ in range(n)]
+
+    def __repr__(self):
+        return f"Uniform({self.low}, {self.high})"
+
+
+# triangular distribution, e.g. installed size (most likely nominal, limited both ways)
+class Triangular:
+    def __init__(self, low: float, mode: float, high: float):
+        self.low = low
+        self.mode = mode
+        self.high = high
+
+    def sample(self, rng, n):
+        triangular = rng.triangular
+        return [triangular(self.low, self.high, self.mode) for _ in range(n)]
+
+    def __repr__(self):
+        return f"Triangular({self.low}, {self.mode}, {self.high})"
+
+
+# Duct inputs that can be given a distribution (same names as Duct / duct_properties)
+UNCERTAIN_INPUTS = ["flow_rate", "roughness", "temperature", "relative_humidity", "elevation",
+                    "noise_direction_factor", "noise_distance", "width", "height", "diameter"]
+
+
+# which sampled values can go through the duct chain -- anything else is dropped and counted as failed
+# (a negative roughness makes Altshul-Tsal's fourth root complex, humidity is a percentage)
+VALID_SAMPLES = {
+    "flow_rate": lambda v: v > 0,
+    "width": lambda v: v > 0,
+    "height": lambda v: v > 0,
+    "diameter": lambda v: v > 0,
+    "noise_distance": lambda v: v > 0,
+    "noise_direction_factor": lambda v: v > 0,
+    "roughness": lambda v: v >= 0,
+    "relative_humidity": lambda v: 0 <= v <= 100,
+}
+
+
+# the random stream for one chunk -- independent of which process runs it
+# str seeds are hashed with sha512 by random.Random, so streams don't overlap in practice
+def substream(seed: int, duct_id: str, chunk: int):
+    return random.Random(f"{seed}:{duct_id}:{chunk}")
+
+
+# WORKER
+# evaluate one chunk of samples -> (velocity, total pressure drop, SPL) arrays + failed count
+# module level so it can be pickled into worker processes
+def run_chunk(duct_type: str, inputs: dict, seed: int, duct_id: str, chunk: int, n: int):
+    rng = substream(seed, duct_id, chunk)
+    # sample in a fixed input order so the stream is consumed the same way every run
+    # inputs left out use the same defaults as the UI/schedules
+    drawn = {name: inputs.get(name, Fixed(INPUT_DEFAULTS[name])).sample(rng, n) for name in UNCERTAIN_INPUTS}
+
+    # drop physically impossible samples before the chain
+    # (non-positive flow/size/distance, negative roughness, humidity outside 0-100%)
+    keep = [True] * n
+    for name, valid in VALID_SAMPLES.items():
+        values = drawn[name]
+        if isinstance(values, list):
+            keep = [k and valid(v) for k, v in zip(keep, values)]
+    failed = n - sum(keep)
+    if failed:
+        drawn = {name: [v for v, k in zip(values, keep) if k] if isinstance(values, list) else values
+                 for name, values in drawn.items()}
+    count = n - failed
+    if count == 0:
+        return array("d"), array("d"), array("d"), failed
+
+    # air properties -- a single value if the conditions are all fixed
+    densities, viscosities = air_properties(drawn["temperature"], drawn["relative_humidity"], drawn["elevation"])
+    if not any(isinstance(drawn[name], list) for name in ("temperature", "relative_humidity", "elevation")):
+        densities, viscosities = densities[0], viscosities[0]
+
+    # section properties -- a single value if the size is fixed
+    widths, heights, diameters = drawn["width"], drawn["height"], drawn["diameter"]
+    if any(isinstance(v, list) for v in (widths, heights, diameters)):
+        widths, heights, diameters = broadcast(widths, heights, diameters)
+        sections = [section(duct_type, W, H, D) for W, H, D in zip(widths, heights, diameters)]
+        areas = [s[0] for s in sections]
+        hydraulic_diameters = [s[1] for s in sections]
+    else:
+        areas, hydraulic_diameters = section(duct_type, widths, heights, diameters)
+
+    results = evaluate(areas, hydraulic_diameters, drawn["flow_rate"], drawn["roughness"], densities, viscosities)
+
+    # sound (same as Duct.calculate_SWL / calculate_SPL)
+    velocities, areas, directions, distances = broadcast(
+        results["velocity"], areas, drawn["noise_direction_factor"], drawn["noise_distance"])
+    log10 = math.log10
+    SPL = [10 + 50 * log10(V) + 10 * log10(A) - abs(10 * log10(Q / (4 * math.pi * r**2)))
+           for V, A, Q, r in zip(velocities, areas, directions, distances)]
+
+    return array("d", velocities), array("d", results["total_pressure_drop"]), array("d", SPL), failed
+
+
+# this is our uncertainty analysis class -- one duct, many samples
+class UncertaintyAnalysis:
+    def __init__(self,
+                 duct_type: str,
+                 inputs: dict,
+                 samples: int = 100_000,
+                 seed: int = 0,
+                 duct_id: str = "duct",
+                 chunk_size: int = 25_000,
+                 workers: int | None = None,
+                 ):
+        self.duct_type = duct_type  # rectangular or round
+        # plain numbers are fixed inputs, anything with sample() is a distribution
+        self.inputs = {name: value if hasattr(value, "sample") else Fixed(value) for name, value in inputs.items()}
+        unknown = set(self.inputs) - set(UNCERTAIN_INPUTS)
+        if unknown:
+            raise ValueError(f"Unknown duct inputs: {', '.join(sorted(unknown))}")
+
+        # same required inputs as schedule.normalise_row -- caught here rather than deep in a worker process
+        def missing(name):
+            value = self.inputs.get(name)
+            return value is None or isinstance(value, Fixed) and value.value is None
+        if missing("flow_rate"):
+            raise ValueError(f"{duct_id}: flow rate must be provided!")
+        if duct_type == "Rectangular" and (missing("width") or missing("height")):
+            raise ValueError(f"{duct_id}: width and height must be provided for rectangular duct!")
+        if duct_type == "Round" and missing("diameter"):
+            raise ValueError(f"{duct_id}: diameter must be provided for round duct!")
+        self.samples = samples  # total samples
+        self.seed = seed  # base seed -- same seed, same answer
+        self.duct_id = duct_id  # keys this duct's substreams
+        self.chunk_size = chunk_size  # samples per work unit (fixed, so results don't depend on workers)
+        self.workers = workers or os.cpu_count() or 1  # processes
+
+    # (chunk index, chunk size) work units
+    def _chunks(self):
+        chunks = []
+        for chunk, start in enumerate(range(0, self.samples, self.chunk_size)):
+            chunks.append((chunk, min(self.chunk_size, self.samples - start)))
+        return chunks
+
+    # run every chunk (in parallel when there's more than one worker) and summarise
+    def run(self):
+        chunks = self._chunks()
+        args = [(self.duct_type, self.inputs, self.seed, self.duct_id, chunk, n) for chunk, n in chunks]
+
+        if self.workers == 1 or len(chunks) == 1:
+            outputs = [run_chunk(*a) for a in args]
+        else:
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(chunks))) as pool:
+                # map() keeps chunk order, so merging is deterministic
+                outputs = list(pool.map(run_chunk, *zip(*args)))
+
+        velocity, pressure, SPL = array("d"), array("d"), array("d")
+        failed = 0
+        for v, p, s, f in outputs:
+            velocity.extend(v)
+            pressure.extend(p)
+            SPL.extend(s)
+            failed += f
+        if not velocity:
+            raise ValueError("No valid samples -- check the input distributions!")
+
+        return {
+            "samples": self.samples,
+            "failed": failed,  # samples dropped as physically impossible (see VALID_SAMPLES)
+            "velocity": self.percentiles(velocity),  # m/s
+            "total_pressure_drop": self.percentiles(pressure),  # Pa/m
+            "SPL": self.percentiles(SPL),  # dB
+        }
+
+    # percentile summary of one output
+    @staticmethod
+    def percentiles(values):
+        ordered = sorted(values)
+        summary = {f"p{p}": percentile(ordered, p / 100) for p in (1, 5, 25, 50, 75, 95, 99)}
+        summary["mean"] = sum(ordered) / len(ordered)
+        return summary
+
+
+# Main guard
+# This runs only when uncertainty.py is executed directly
+if __name__ == "__main__":
+    import time  # timing
+
+    inputs = {
+        "flow_rate": Uniform.plus_minus(300, 0.10),  # measured flow ±10%
+        "roughness": Triangular(0.03, 0.09, 0.5),  # sheet metal, drifting rougher with wear
+        "temperature": Normal(25, 3),
+        "relative_humidity": Uniform(35, 65),
+        "elevation": 100,
+        "noise_direction_factor": 1,
+        "noise_distance": 2.1,
+        "width": Triangular(395, 400, 410),  # installed size deviation (mm)
+        "height": Triangular(195, 200, 205),
+    }
+
+    for workers in (1, os.cpu_count() or 1):
+        start = time.perf_counter()
+        results = UncertaintyAnalysis("Rectangular", inputs, samples=200_000, seed=42, workers=workers).run()
+        print(f"{workers} worker(s): {results['samples']} samples in {time.perf_counter() - start:.2f} s")
+        for name, unit in (("velocity", "m/s"), ("total_pressure_drop", "Pa/m"), ("SPL", "dB")):
+            r = results[name]
+            print(f"  {name}: p5 {r['p5']:.3f}  p50 {r['p50']:.3f}  p95 {r['p95']:.3f} {unit}")
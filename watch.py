@@ -0,0 +1,203 @@
+# watch.py
+# watch mode for duct schedules re-exported from the BIM model
+# every row's normalised inputs are hashed and diffed against the previous run,
+# only new or changed rows are solved, then the results file + a change report are rewritten
+#
+# usage: python3 watch.py schedule.csv [--results out.csv] [--velocity-limit 7.5] [--pressure-limit 1.0]
+
+import csv  # csv.Error from a half written export
+import hashlib  # row hashes
+import json  # state file + stable hashing
+import os  # file stats + atomic replace
+import time  # polling + report timestamps
+import zipfile  # BadZipFile from a half written .xlsx
+from xml.etree.ElementTree import ParseError  # truncated sheet XML
+
+from controller import DuctController  # our duct controller
+from schedule import INPUT_TYPES, RESULT_COLUMNS, normalise_row, read_schedule, solve_inputs, write_schedule
+
+
+# hash a row's normalised inputs -- column order/spelling in the export doesn't matter, only the values
+def row_hash(inputs: dict):
+    text = json.dumps(inputs, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+# this is our schedule watcher class
+class ScheduleWatcher:
+    def __init__(self,
+                 schedule_path: str,
+                 results_path: str | None = None,
+                 report_path: str | None = None,
+                 velocity_limit: float = 7.5,  # m/s
+                 pressure_limit: float = 1.0,  # static Pa/m
+                 ):
+        base, _ = os.path.splitext(schedule_path)
+        self.schedule_path = schedule_path  # the file the BIM model re-exports
+        self.results_path = results_path or base + "_results.csv"  # solved schedule
+        self.report_path = report_path or base + "_changes.txt"  # what changed last run
+        self.state_path = self.results_path + ".state.json"  # hashes + results from the last run
+        self.velocity_limit = velocity_limit
+        self.pressure_limit = pressure_limit
+        self.controller = DuctController()
+
+        # id -> {"hash": ..., "results": {...}} from the previous run
+        self.state = self._load_state()
+        self._last_stat = None  # (mtime, size) of the schedule last time we ran
+
+    # STATE
+    # previous run's hashes and results survive restarts, so the first run after a restart is incremental too
+    def _load_state(self):
+        if not os.path.exists(self.state_path):
+            return {}
+        with open(self.state_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _save_state(self):
+        temp_path = self.state_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, separators=(",", ":"))
+        os.replace(temp_path, self.state_path)  # never leave a half written state file
+
+    # which limits does a result break? (velocity, pressure) booleans
+    def _over_limits(self, results: dict):
+        velocity = results.get("Velocity (m/s)")
+        pressure = results.get("Static Pressure Drop (Pa/m)")
+        return (velocity != "" and velocity is not None and velocity > self.velocity_limit,
+                pressure != "" and pressure is not None and pressure > self.pressure_limit)
+
+    # RUN
+    # diff the schedule against the last run, solve what changed, write results + report
+    def run_once(self):
+        previous = self.state
+        current = {}  # new state
+        output_rows = []  # results file rows in schedule order
+        report = {"added": [], "changed": [], "removed": [], "unchanged": 0, "errors": [], "crossings": []}
+
+        for number, row in enumerate(read_schedule(self.schedule_path), start=2):  # row 1 = header
+            try:
+                duct_id, inputs = normalise_row(row, number)
+            except ValueError as e:
+                report["errors"].append(str(e))
+                output_rows.append({"id": f"Row {number}", "Error": str(e)})  # keep the row visible in the results
+                continue
+
+            if duct_id in current:  # duplicate tag in the export, keep both rows
+                duct_id = f"{duct_id} (row {number})"
+
+            digest = row_hash(inputs)
+            old = previous.get(duct_id)
+
+            if old is not None and old["hash"] == digest:
+                results = old["results"]  # unchanged -- reuse, no solve
+                report["unchanged"] += 1
+            else:
+                results = solve_inputs(self.controller, inputs)
+                report["added" if old is None else "changed"].append(duct_id)
+                self._check_crossings(duct_id, old["results"] if old else None, results, report)
+
+            current[duct_id] = {"hash": digest, "results": results}
+            output_rows.append({"id": duct_id} | inputs | results)
+
+        report["removed"] = [duct_id for duct_id in previous if duct_id not in current]
+
+        # write outputs, then commit the new state
+        columns = ["id"] + list(INPUT_TYPES) + RESULT_COLUMNS
+        write_schedule(self.results_path, columns, output_rows)
+        self._write_report(report, len(output_rows))
+        self.state = current
+        self._save_state()
+        return report
+
+    # record any velocity / Pa/m limit a solved row crossed (either direction)
+    def _check_crossings(self, duct_id, old_results, new_results, report):
+        new_over = self._over_limits(new_results)
+        old_over = self._over_limits(old_results) if old_results else (False, False)
+        checks = (("velocity", "Velocity (m/s)", self.velocity_limit, "m/s"),
+                  ("pressure drop", "Static Pressure Drop (Pa/m)", self.pressure_limit, "Pa/m"))
+
+        for (label, column, limit, unit), was_over, is_over in zip(checks, old_over, new_over):
+            if was_over == is_over:
+                continue  # no crossing
+            before = old_results.get(column, "-") if old_results else "new"
+            direction = "over" if is_over else "back under"
+            report["crossings"].append(
+                f"{duct_id}: {label} {before} -> {new_results[column]} {unit} ({direction} {limit} {unit} limit)")
+
+    # plain text change report for the design coordinators
+    def _write_report(self, report, row_count):
+        lines = [
+            f"Schedule: {self.schedule_path}",
+            f"Run: {time.strftime('%Y-%m-%d %H:%M:%S')}",
+            f"Rows: {row_count}  Added: {len(report['added'])}  Changed: {len(report['changed'])}  "
+            f"Removed: {len(report['removed'])}  Unchanged: {report['unchanged']}",
+            "",
+            "Limit crossings:",
+        ]
+        lines += [f"  {line}" for line in report["crossings"]] or ["  none"]
+        for title, key in (("Added", "added"), ("Changed", "changed"), ("Removed", "removed"), ("Errors", "errors")):
+            if report[key]:
+                lines += ["", f"{title}:"] + [f"  {item}" for item in report[key]]
+
+        with open(self.report_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+    # WATCH
+    # has the schedule been re-exported since the last run?
+    def _schedule_changed(self):
+        try:
+            stat = os.stat(self.schedule_path)
+        except FileNotFoundError:
+            return False  # mid re-export (deleted + rewritten), try again next poll
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature == self._last_stat:
+            return False
+        self._last_stat = signature
+        return True
+
+    # poll the schedule file forever (Ctrl+C to stop)
+    def watch(self, poll_seconds: float = 2.0, settle_seconds: float = 0.5):
+        print(f"Watching {self.schedule_path} (Ctrl+C to stop)")
+        try:
+            while True:
+                if self._schedule_changed():
+                    time.sleep(settle_seconds)  # let the exporter finish writing
+                    self._schedule_changed()  # re-stat so the settle write doesn't retrigger
+                    try:
+                        report = self.run_once()
+                    except (OSError, zipfile.BadZipFile, csv.Error, ParseError) as e:
+                        # caught the exporter mid write (file gone, half written workbook...)
+                        # state is only saved at the end of a run, so it's untouched -- retry next poll
+                        self._last_stat = None
+                        print(f"{time.strftime('%H:%M:%S')} schedule not readable yet ({e}), retrying")
+                        time.sleep(poll_seconds)
+                        continue
+                    print(f"{time.strftime('%H:%M:%S')} solved {len(report['added']) + len(report['changed'])}, "
+                          f"reused {report['unchanged']}, removed {len(report['removed'])}, "
+                          f"{len(report['crossings'])} limit crossing(s)")
+                time.sleep(poll_seconds)
+        except KeyboardInterrupt:
+            print("Stopped watching")
+
+
+# Main guard
+# This runs only when watch.py is executed directly
+if __name__ == "__main__":
+    import argparse  # command line options
+
+    parser = argparse.ArgumentParser(description="Re-solve only the changed rows of a duct schedule")
+    parser.add_argument("schedule", help="schedule file to watch (CSV)")
+    parser.add_argument("--results", help="results file (default: <schedule>_results.csv)")
+    parser.add_argument("--report", help="change report (default: <schedule>_changes.txt)")
+    parser.add_argument("--velocity-limit", type=float, default=7.5, help="velocity limit (m/s)")
+    parser.add_argument("--pressure-limit", type=float, default=1.0, help="static pressure drop limit (Pa/m)")
+    parser.add_argument("--poll", type=float, default=2.0, help="seconds between checks")
+    parser.add_argument("--once", action="store_true", help="run once and exit instead of watching")
+    args = parser.parse_args()
+
+    watcher = ScheduleWatcher(args.schedule, args.results, args.report,
+                              args.velocity_limit, args.pressure_limit)
+    if args.once:
+        print(watcher.run_once())
+    else:
+        watcher.watch(args.poll)
@@ -0,0 +1,418 @@
+# xlsx.py
+# streaming .xlsx reader + writer -- no third party libraries, just zipfile + incremental XML parsing
+# rows are parsed and handed over one at a time, and each parsed row is cleared from the XML tree
+# straight away, so memory stays bounded however many rows the schedule has
+# the shared strings table needs random access, so it's spilled to a temp file with an offset index
+
+import posixpath  # zip member paths always use /
+import tempfile  # spill file for shared strings
+import zipfile  # an .xlsx is just a zip of XML parts
+from array import array  # compact offset index
+from functools import lru_cache  # hot shared strings (types, systems) stay in memory
+from xml.etree.ElementTree import iterparse  # incremental XML parsing
+from xml.sax.saxutils import escape  # XML-safe cell text
+
+# spreadsheetml namespaces
+NS_MAIN = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+NS_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+NS_PKG_REL = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+# fully qualified tag names we match on while parsing
+TAG_ROW = f"{{{NS_MAIN}}}row"
+TAG_CELL = f"{{{NS_MAIN}}}c"
+TAG_VALUE = f"{{{NS_MAIN}}}v"
+TAG_TEXT = f"{{{NS_MAIN}}}t"
+TAG_INLINE = f"{{{NS_MAIN}}}is"
+TAG_SI = f"{{{NS_MAIN}}}si"
+TAG_SHEET = f"{{{NS_MAIN}}}sheet"
+TAG_SHEET_DATA = f"{{{NS_MAIN}}}sheetData"
+TAG_RELATIONSHIP = f"{{{NS_PKG_REL}}}Relationship"
+
+
+# "A" -> 0, "Z" -> 25, "AA" -> 26 (cell refs look like "AB12")
+def column_index(ref: str):
+    index = 0
+    for char in ref:
+        if char.isdigit():
+            break  # hit the row number
+        index = index * 26 + (ord(char.upper()) - 64)
+    return index - 1
+
+
+# 0 -> "A", 25 -> "Z", 26 -> "AA"
+def column_letter(index: int):
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+# SHARED STRINGS
+# Excel exports every text cell into one shared strings table and cells point into it by index
+# a schedule with a unique tag per row has as many strings as rows, so holding them in a list isn't bounded
+# each string is appended (utf-8) to an anonymous temp file and only its end offset is kept -- 8 bytes per string
+class SharedStrings:
+    def __init__(self, cache_size: int = 4096):
+        self._file = tempfile.TemporaryFile()  # deleted on close
+        self._offsets = array("Q", [0])  # string i lives at offsets[i]:offsets[i + 1]
+        self.get = lru_cache(maxsize=cache_size)(self._read)  # the same few strings repeat down a schedule
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: int):
+        return self.get(index)
+
+    def append(self, text: str):
+        data = text.encode("utf-8")
+        self._file.seek(self._offsets[-1])
+        self._file.write(data)
+        self._offsets.append(self._offsets[-1] + len(data))
+
+    def _read(self, index: int):
+        if not 0 <= index < len(self):
+            raise IndexError(f"Shared string {index} out of range!")
+        start = self._offsets[index]
+        self._file.seek(start)
+        return self._file.read(self._offsets[index + 1] - start).decode("utf-8")
+
+    def close(self):
+        self.get.cache_clear()
+        self._file.close()
+
+
+# READER
+# streams the rows of one worksheet as lists of cell values (str, int or float, None for blanks)
+class XlsxReader:
+    def __init__(self, path: str, sheet: str | None = None):
+        self.path = path  # workbook path
+        self.sheet = sheet  # sheet name, None = first sheet
+        self._zip = zipfile.ZipFile(path)
+        self._sheet_path = self._find_sheet()
+        self._shared = self._load_shared_strings()
+
+    # context manager so the zip handle gets closed
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._shared.close()
+        self._zip.close()
+
+    # workbook.xml lists the sheets, its .rels file maps them to worksheet parts
+    def _find_sheet(self):
+        relationship_id = None
+        with self._zip.open("xl/workbook.xml") as f:
+            for _, elem in iterparse(f):
+                if elem.tag == TAG_SHEET and (self.sheet is None or elem.get("name") == self.sheet):
+                    relationship_id = elem.get(f"{{{NS_REL}}}id")
+                    break
+        if relationship_id is None:
+            raise ValueError(f"Sheet not found in workbook: {self.sheet}")
+
+        with self._zip.open("xl/_rels/workbook.xml.rels") as f:
+            for _, elem in iterparse(f):
+                if elem.tag == TAG_RELATIONSHIP and elem.get("Id") == relationship_id:
+                    target = elem.get("Target")
+                    # targets are relative to xl/ unless they start with /
+                    if target.startswith("/"):
+                        return target.lstrip("/")
+                    return posixpath.normpath(posixpath.join("xl", target))
+        raise ValueError(f"Worksheet part missing for sheet: {self.sheet}")
+
+    # shared strings are referenced by index from "s" type cells -- streamed into the spill file
+    def _load_shared_strings(self):
+        strings = SharedStrings()
+        if "xl/sharedStrings.xml" not in self._zip.namelist():
+            return strings  # workbook only uses inline strings / numbers
+        try:
+            self._spill_shared_strings(strings)
+        except BaseException:
+            strings.close()  # don't leave the spill file behind on a bad workbook
+            raise
+        return strings
+
+    def _spill_shared_strings(self, strings: SharedStrings):
+        with self._zip.open("xl/sharedStrings.xml") as f:
+            sst = None
+            for event, elem in iterparse(f, events=("start", "end")):
+                if event == "start":
+                    if sst is None:
+                        sst = elem  # root <sst> -- cleared as we go so parsed <si> don't pile up
+                    continue
+                if elem.tag == TAG_SI:
+                    # plain <t> or rich text runs <r><t>..</t></r> -- join all text pieces
+                    strings.append("".join(t.text or "" for t in elem.iter(TAG_TEXT)))
+                    elem.clear()
+                    sst.clear()
+
+    # convert one <c> element to a python value
+    def _cell_value(self, cell):
+        cell_type = cell.get("t", "n")
+        if cell_type == "inlineStr":
+            inline = cell.find(TAG_INLINE)
+            return "".join(t.text or "" for t in inline.iter(TAG_TEXT)) if inline is not None else None
+
+        value = cell.findtext(TAG_VALUE)
+        if value is None:
+            return None  # styled but empty cell
+
+        match (cell_type):
+            case "s":  # shared string
+                return self._shared[int(value)]
+            case "str" | "e":  # formula string / error
+                return value
+            case "b":  # boolean
+                return int(value)
+            case _:  # number
+                number = float(value)
+                return int(number) if number.is_integer() and abs(number) < 1e15 else number
+
+    # yield each row as a list of values, blank cells/rows filled with None
+    def rows(self):
+        expected_row = 1  # spreadsheet rows are 1-based
+        with self._zip.open(self._sheet_path) as f:
+            sheet_data = None
+            for event, elem in iterparse(f, events=("start", "end")):
+                if event == "start":
+                    if elem.tag == TAG_SHEET_DATA:
+                        sheet_data = elem  # parent of every row -- cleared as we go
+                    continue
+                if elem.tag != TAG_ROW:
+                    continue
+
+                # rows with nothing in them are skipped in the file, hand back empties to keep numbering
+                row_number = int(elem.get("r", expected_row))
+                while expected_row < row_number:
+                    yield []
+                    expected_row += 1
+                expected_row = row_number + 1
+
+                values = []
+                for position, cell in enumerate(elem.iter(TAG_CELL)):
+                    ref = cell.get("r")
+                    index = column_index(ref) if ref else position
+                    if index > len(values):
+                        values.extend([None] * (index - len(values)))  # skipped blank cells
+                    values.append(self._cell_value(cell))
+                yield values
+
+                # drop the parsed row so the tree never grows
+                elem.clear()
+                if sheet_data is not None:
+                    sheet_data.clear()
+
+    # yield each data row as a dict keyed by the header row (first row)
+    def dicts(self):
+        rows = self.rows()
+        header = next(rows, None)
+        if header is None:
+            return
+        header = [str(name) if name is not None else f"Column {i + 1}" for i, name in enumerate(header)]
+        for values in rows:
+            if not any(value is not None and value != "" for value in values):
+                continue  # blank row
+            yield dict(zip(header, values + [None] * (len(header) - len(values))))
+
+
+# WRITER
+# streams rows straight into the worksheet part of a new .xlsx
+# strings are written inline (no shared strings table) so nothing accumulates in memory
+class XlsxWriter:
+    def __init__(self, path: str, sheet_name: str = "Sheet1"):
+        self.path = path  # output workbook
+        self.sheet_name = sheet_name  # single sheet
+        self._zip = zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED)
+        # force_zip64 -- we don't know the final size up front and it can pass 2 GB
+        self._sheet = self._zip.open("xl/worksheets/sheet1.xml", "w", force_zip64=True)
+        self._letters = []  # cached column letters
+        self._row = 0  # rows written so far
+        self._write('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                    f'<worksheet xmlns="{NS_MAIN}"><sheetData>')
+
+    # context manager so the workbook gets finished properly
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _write(self, text: str):
+        self._sheet.write(text.encode("utf-8"))
+
+    # column letter for index, cached as most rows reuse the same columns
+    def _letter(self, index: int):
+        while len(self._letters) <= index:
+            self._letters.append(column_letter(len(self._letters)))
+        return self._letters[index]
+
+    # append one row of values (None / "" = blank cell)
+    def write_row(self, values):
+        self._row += 1
+        row = self._row
+        cells = []
+        for index, value in enumerate(values):
+            if value is None or value == "":
+                continue
+            ref = f"{self._letter(index)}{row}"
+            if isinstance(value, bool):
+                cells.append(f'<c r="{ref}" t="b"><v>{int(value)}</v></c>')
+            elif isinstance(value, (int, float)):
+                cells.append(f'<c r="{ref}"><v>{value!r}</v></c>')
+            else:
+                text = escape(str(value))
+                space = ' xml:space="preserve"' if text != text.strip() else ""
+                cells.append(f'<c r="{ref}" t="inlineStr"><is><t{space}>{text}</t></is></c>')
+        self._write(f'<row r="{row}">{"".join(cells)}</row>')
+
+    # close the sheet and write the small fixed parts that make it a valid workbook
+    def close(self):
+        if self._sheet is None:
+            return  # already closed
+        self._write("</sheetData></worksheet>")
+        self._sheet.close()
+        self._sheet = None
+
+        self._zip.writestr("[Content_Types].xml",
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            '<Override PartName="/xl/worksheets/sheet1.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+            '</Types>')
+        self._zip.writestr("_rels/.rels",
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            f'<Relationships xmlns="{NS_PKG_REL}">'
+            '<Relationship Id="rId1" Target="xl/workbook.xml" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+            '</Relationships>')
+        self._zip.writestr("xl/workbook.xml",
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            f'<workbook xmlns="{NS_MAIN}" xmlns:r="{NS_REL}"><sheets>'
+            f'<sheet name="{escape(self.sheet_name, {chr(34): "&quot;"})}" sheetId="1" r:id="rId1"/>'
+            '</sheets></workbook>')
+        self._zip.writestr("xl/_rels/workbook.xml.rels",
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            f'<Relationships xmlns="{NS_PKG_REL}">'
+            '<Relationship Id="rId1" Target="worksheets/sheet1.xml" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet"/>'
+            '</Relationships>')
+        self._zip.close()
+
+
+# Main guard
+# This runs only when xlsx.py is executed directly
+# python3 xlsx.py [rows] -- writes a schedule workbook, then streams it through the duct solver
+if __name__ == "__main__":
+    import os  # file size
+    import sys  # row count arg
+    import tempfile  # throwaway folder
+    import time  # throughput
+    import tracemalloc  # peak memory
+    from schedule import solve_schedule  # stream schedule -> results
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    folder = tempfile.mkdtemp()
+    schedule_path = os.path.join(folder, "schedule.xlsx")
+    results_path = os.path.join(folder, "schedule_results.xlsx")
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    with XlsxWriter(schedule_path, "Schedule") as writer:
+        writer.write_row(["Tag", "Type", "Flow Rate", "Width (mm)", "Height (mm)", "Diameter (mm)"])
+        for i in range(count):
+            if i % 2:
+                writer.write_row([f"SA-{i:06d}", "Rectangular", 100 + i % 900, 400, 300, None])
+            else:
+                writer.write_row([f"SA-{i:06d}", "Round", 100 + i % 900, None, None, 315])
+    print(f"Wrote {count} rows in {time.perf_counter() - start:.1f} s ({os.path.getsize(schedule_path)} bytes)")
+
+    start = time.perf_counter()
+    solved = solve_schedule(schedule_path, results_path)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    print(f"Solved {solved} rows in {elapsed:.1f} s ({solved / elapsed:.0f} rows/s), peak memory {peak / 1e6:.1f} MB")
+
+    with XlsxReader(results_path) as reader:
+        rows = reader.rows()
+        print(next(rows))
+        print(next(rows))
+
+    # same schedule the way Excel saves it -- every text cell in the shared strings table, one unique tag per row
+    shared_path = os.path.join(folder, "schedule_shared.xlsx")
+    with zipfile.ZipFile(shared_path, "w", compression=zipfile.ZIP_DEFLATED) as z:
+        header = ["Tag", "Type", "Flow Rate", "Width (mm)", "Height (mm)", "Diameter (mm)"]
+        fixed = {text: i for i, text in enumerate(header + ["Round", "Rectangular"])}
+        with z.open("xl/sharedStrings.xml", "w", force_zip64=True) as f:
+            f.write(f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n<sst xmlns="{NS_MAIN}">'.encode())
+            for text in fixed:
+                f.write(f"<si><t>{text}</t></si>".encode())
+            for i in range(count):
+                f.write(f"<si><t>SA-{i:06d}</t></si>".encode())
+            f.write(b"</sst>")
+        with z.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as f:
+            f.write(f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                    f'<worksheet xmlns="{NS_MAIN}"><sheetData>'.encode())
+            cells = "".join(f'<c r="{column_letter(c)}1" t="s"><v>{c}</v></c>' for c in range(len(header)))
+            f.write(f'<row r="1">{cells}</row>'.encode())
+            for i in range(count):
+                row = i + 2
+                tag = f'<c r="A{row}" t="s"><v>{len(fixed) + i}</v></c>'
+                if i % 2:
+                    f.write(f'<row r="{row}">{tag}<c r="B{row}" t="s"><v>{fixed["Rectangular"]}</v></c>'
+                            f'<c r="C{row}"><v>{100 + i % 900}</v></c><c r="D{row}"><v>400</v></c>'
+                            f'<c r="E{row}"><v>300</v></c></row>'.encode())
+                else:
+                    f.write(f'<row r="{row}">{tag}<c r="B{row}" t="s"><v>{fixed["Round"]}</v></c>'
+                            f'<c r="C{row}"><v>{100 + i % 900}</v></c><c r="F{row}"><v>315</v></c></row>'.encode())
+            f.write(b"</sheetData></worksheet>")
+        z.writestr("[Content_Types].xml",
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            '<Override PartName="/xl/worksheets/sheet1.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+            '<Override PartName="/xl/sharedStrings.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/>'
+            '</Types>')
+        z.writestr("_rels/.rels",
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            f'<Relationships xmlns="{NS_PKG_REL}">'
+            '<Relationship Id="rId1" Target="xl/workbook.xml" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+            '</Relationships>')
+        z.writestr("xl/workbook.xml",
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            f'<workbook xmlns="{NS_MAIN}" xmlns:r="{NS_REL}"><sheets>'
+            '<sheet name="Schedule" sheetId="1" r:id="rId1"/></sheets></workbook>')
+        z.writestr("xl/_rels/workbook.xml.rels",
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            f'<Relationships xmlns="{NS_PKG_REL}">'
+            '<Relationship Id="rId1" Target="worksheets/sheet1.xml" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet"/>'
+            '<Relationship Id="rId2" Target="sharedStrings.xml" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/sharedStrings"/>'
+            '</Relationships>')
+
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    solved = solve_schedule(shared_path, results_path)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    print(f"Solved {solved} shared string rows in {elapsed:.1f} s ({solved / elapsed:.0f} rows/s), "
+          f"peak memory {peak / 1e6:.1f} MB")
+    with XlsxReader(results_path) as reader:
+        rows = reader.rows()
+        next(rows)
+        print(next(rows))